@@ -0,0 +1,65 @@
+from posts.media import image_storage
+
+
+class Fieldset:
+    """
+    Поля ответа API и столбцы, из которых они берутся. Строки читаются
+    через values() только по запрошенным ?fields=, без создания
+    объектов моделей.
+    """
+
+    def __init__(self, columns, transforms=None):
+        self.columns = columns
+        self.transforms = transforms or {}
+
+    def parse(self, value):
+        """Поля из ?fields=a,b; без параметра — все. Ошибка — ValueError."""
+        if not value:
+            return list(self.columns)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.columns]
+        if unknown or not names:
+            raise ValueError(
+                'Неизвестные поля: ' + ', '.join(unknown or [value])
+            )
+        return names
+
+    def values(self, queryset, names, extra=()):
+        """queryset.values() по столбцам полей names и служебным extra."""
+        columns = {self.columns[name] for name in names}
+        return queryset.values(*columns.union(extra))
+
+    def serialize(self, row, names):
+        data = {}
+        for name in names:
+            value = row[self.columns[name]]
+            if name in self.transforms:
+                value = self.transforms[name](value)
+            data[name] = value
+        return data
+
+
+def image_url(name):
+    return image_storage().url(name) if name else None
+
+
+POST_FIELDS = Fieldset(
+    {
+        'id': 'pk',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'comments_count': 'comments_count',
+    },
+    {'image': image_url},
+)
+
+COMMENT_FIELDS = Fieldset({
+    'id': 'pk',
+    'post': 'post_id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+})
@@ -0,0 +1,33 @@
+import datetime
+import json
+
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def dumps(data):
+    """
+    JSON в байтах. orjson, если установлен, в разы быстрее json
+    на длинных лентах; вывод у обоих одинаковый.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        data, ensure_ascii=False, separators=(',', ':'), default=_default
+    ).encode()
+
+
+class JSONResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), **kwargs)
@@ -0,0 +1,160 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post
+
+from .. import renderers
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Albus')
+        cls.reader = User.objects.create_user(username='Severus')
+        cls.group = Group.objects.create(title='Зелья', slug='potions')
+        now = timezone.now()
+        cls.posts = []
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+                text=f'Пост {i}',
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=10 - i)
+            )
+            cls.posts.append(post)
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Привет'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get(self, name, client=None, data=None, **kwargs):
+        response = (client or self.client).get(
+            reverse(f'api:v1:{name}', kwargs=kwargs), data
+        )
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response, json.loads(response.content)
+
+    def test_feed_pages_follow_cursors(self):
+        response, data = self.get('index', data={'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[4].pk, self.posts[3].pk],
+        )
+        self.assertIsNone(data['previous'])
+        self.assertEqual(set(data['results'][0]), {
+            'id', 'text', 'pub_date', 'author', 'group', 'image',
+            'comments_count',
+        })
+        self.assertEqual(data['results'][1]['group'], 'potions')
+        seen = [post['id'] for post in data['results']]
+        while data['next']:
+            data = json.loads(self.client.get(data['next']).content)
+            seen += [post['id'] for post in data['results']]
+        self.assertEqual(seen, [post.pk for post in self.posts[::-1]])
+        self.assertIsNotNone(data['previous'])
+        data = json.loads(self.client.get(data['previous']).content)
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[2].pk, self.posts[1].pk],
+        )
+
+    def test_sparse_fields_read_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response, data = self.get('index', data={'fields': 'id,author'})
+        self.assertEqual(data['results'][0],
+                         {'id': self.posts[4].pk, 'author': 'Albus'})
+        selects = [query['sql'] for query in queries
+                   if '"posts_post"' in query['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"posts_post"."text"', selects[0])
+        self.assertNotIn('posts_group', selects[0])
+        response, data = self.get('index', data={'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', data['detail'])
+
+    def test_batch_fetch_by_ids(self):
+        ids = [self.posts[1].pk, 999, self.posts[3].pk]
+        response, data = self.get('index', data={
+            'ids': ','.join(map(str, ids)), 'fields': 'id,text',
+        })
+        self.assertEqual(data, {'results': [
+            {'id': self.posts[1].pk, 'text': 'Пост 1'},
+            {'id': self.posts[3].pk, 'text': 'Пост 3'},
+        ]})
+        response, data = self.get('group_posts', slug='potions', data={
+            'ids': f'{self.posts[0].pk},{self.posts[1].pk}',
+        })
+        self.assertEqual([post['id'] for post in data['results']],
+                         [self.posts[1].pk])
+        response, _ = self.get('index', data={'ids': '1,x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_group_profile_and_follow_feeds(self):
+        _, data = self.get('group_posts', slug='potions')
+        self.assertEqual([post['id'] for post in data['results']],
+                         [self.posts[3].pk, self.posts[1].pk])
+        _, data = self.get('profile', username='Albus', data={'limit': 10})
+        self.assertEqual(len(data['results']), 5)
+        response, _ = self.get('group_posts', slug='nothing')
+        self.assertEqual(response.status_code, 404)
+        response, _ = self.get('follow_index')
+        self.assertEqual(response.status_code, 401)
+        _, data = self.get('follow_index', client=self.reader_client)
+        self.assertEqual(len(data['results']), 5)
+
+    def test_post_and_comments(self):
+        post = self.posts[0]
+        _, data = self.get('post_detail', post_id=post.pk,
+                           data={'fields': 'text,comments_count'})
+        self.assertEqual(data, {'text': 'Пост 0', 'comments_count': 1})
+        _, data = self.get('post_comments', post_id=post.pk)
+        self.assertEqual(data['results'], [{
+            'id': self.comment.pk, 'post': post.pk, 'text': 'Привет',
+            'created': renderers._default(self.comment.created),
+            'author': 'Severus',
+        }])
+        response, _ = self.get('post_detail', post_id=999)
+        self.assertEqual(response.status_code, 404)
+        response, _ = self.get('post_comments', post_id=999)
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:v1:index'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD')
+
+    def test_conditional_get(self):
+        response, _ = self.get('index')
+        response = self.client.get(
+            reverse('api:v1:index'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_encoders_agree(self):
+        data = {'text': 'Привет', 'created': self.comment.created,
+                'items': [1, None]}
+        with mock.patch.object(renderers, 'orjson', None):
+            fallback = renderers.dumps(data)
+        self.assertEqual(json.loads(renderers.dumps(data)),
+                         json.loads(fallback))
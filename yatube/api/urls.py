@@ -0,0 +1,23 @@
+from django.urls import include, path
+
+from . import views
+
+
+app_name = 'api'
+
+v1 = ([
+    path('posts/', views.index, name='index'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('users/<str:username>/posts/', views.profile, name='profile'),
+    path('follow/posts/', views.follow_index, name='follow_index'),
+], 'v1')
+
+urlpatterns = [
+    path('v1/', include(v1)),
+]
@@ -0,0 +1,164 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404
+
+from posts import page_cache
+from posts.lookups import find_post, get_author_or_404, get_group_or_404
+from posts.models import Comment, Post
+from posts.page_cache import cache_page_versioned
+from posts.paginator import CursorPaginator, decode_cursor
+from posts.timeline import follow_feed
+
+from .fields import COMMENT_FIELDS, POST_FIELDS
+from .renderers import JSONResponse
+
+MAX_LIMIT = 100
+MAX_IDS = 100
+
+
+class BadRequest(Exception):
+    pass
+
+
+def api_view(view):
+    """
+    Только чтение. Ошибки отдаются в JSON: {"detail": "..."}.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            response = error('Метод не поддерживается.', 405)
+            response['Allow'] = 'GET, HEAD'
+            return response
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return error('Не найдено.', 404)
+        except BadRequest as exception:
+            return error(str(exception), 400)
+    return wrapper
+
+
+def error(detail, status):
+    return JSONResponse({'detail': detail}, status=status)
+
+
+def get_fields(request, fieldset):
+    try:
+        return fieldset.parse(request.GET.get('fields'))
+    except ValueError as exception:
+        raise BadRequest(str(exception))
+
+
+def get_int(request, name, default, maximum):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f'{name}: нужно целое число.')
+    if not 1 <= value <= maximum:
+        raise BadRequest(f'{name}: от 1 до {maximum}.')
+    return value
+
+
+def get_ids(request):
+    try:
+        ids = [int(pk) for pk in request.GET['ids'].split(',') if pk]
+    except ValueError:
+        raise BadRequest('ids: нужны целые числа через запятую.')
+    if not 1 <= len(ids) <= MAX_IDS:
+        raise BadRequest(f'ids: от 1 до {MAX_IDS} значений.')
+    return ids
+
+
+def page_url(request, **params):
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(params)
+    return f'{request.path}?{query.urlencode()}'
+
+
+def listing(request, queryset, fieldset, field, key='pk'):
+    """
+    Страница записей queryset в порядке убывания (field, key) с курсорами
+    next/previous, или записи с ?ids= в порядке перечисления.
+    """
+    names = get_fields(request, fieldset)
+    if 'ids' in request.GET:
+        ids = get_ids(request)
+        rows = fieldset.values(queryset.filter(pk__in=ids), names, ['pk'])
+        found = {row['pk']: row for row in rows}
+        return JSONResponse({'results': [
+            fieldset.serialize(found[pk], names) for pk in ids if pk in found
+        ]})
+    rows = fieldset.values(queryset, names, ['pk', field])
+    limit = get_int(request, 'limit', settings.POSTS_PER_PAGE, MAX_LIMIT)
+    page = CursorPaginator(rows, limit, field, key).page(
+        after=decode_cursor(request.GET.get('after')),
+        before=decode_cursor(request.GET.get('before')),
+    )
+    data = {
+        'results': [fieldset.serialize(row, names) for row in page],
+        'next': None,
+        'previous': None,
+    }
+    if page.next_cursor:
+        data['next'] = page_url(request, after=page.next_cursor)
+    if page.previous_cursor:
+        data['previous'] = page_url(request, before=page.previous_cursor)
+    return JSONResponse(data)
+
+
+@api_view
+@cache_page_versioned(page_cache.index_scopes)
+def index(request):
+    return listing(request, Post.objects.all(), POST_FIELDS, 'pub_date')
+
+
+@api_view
+@cache_page_versioned(page_cache.group_scopes)
+def group_posts(request, slug):
+    group = get_group_or_404(slug)
+    posts = Post.objects.filter(group_id=group.pk)
+    return listing(request, posts, POST_FIELDS, 'pub_date')
+
+
+@api_view
+@cache_page_versioned(page_cache.profile_scopes)
+def profile(request, username):
+    author = get_author_or_404(username)
+    posts = Post.objects.filter(author_id=author.pk)
+    return listing(request, posts, POST_FIELDS, 'pub_date')
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error('Нужно войти.', 401)
+    posts = follow_feed(request.user)
+    return listing(request, posts, POST_FIELDS, 'feed_date', 'feed_post')
+
+
+@api_view
+@cache_page_versioned(page_cache.post_scopes)
+def post_detail(request, post_id):
+    names = get_fields(request, POST_FIELDS)
+    row = POST_FIELDS.values(
+        Post.objects.filter(pk=post_id), names, ['pk']
+    ).first()
+    if row is None:
+        raise Http404
+    return JSONResponse(POST_FIELDS.serialize(row, names))
+
+
+@api_view
+@cache_page_versioned(page_cache.post_scopes)
+def post_comments(request, post_id):
+    if find_post(post_id) is None:
+        raise Http404
+    comments = Comment.objects.filter(post_id=post_id)
+    return listing(request, comments, COMMENT_FIELDS, 'created')
@@ -0,0 +1,145 @@
+"""
+Пересборка производных данных по целой таблице: поискового индекса,
+счётчиков, лент, версий картинок. Таблица проходится пачками
+по возрастанию pk (keyset, без OFFSET), поэтому память не растёт
+с размером таблицы, а после каждой пачки в core.Checkpoint
+записывается, докуда дошли: прерванная пересборка продолжается
+с того же места. Пересборки регистрируются декоратором batch_job
+в модулях batches.py приложений.
+"""
+import logging
+from collections import deque
+
+from django.db import close_old_connections, connections
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Checkpoint
+from .tasks import POOLS
+
+logger = logging.getLogger(__name__)
+
+_jobs = {}
+
+
+class BatchJob:
+    """
+    Обработчик пачки: получает queryset с диапазоном pk. Он должен быть
+    идемпотентным — после сбоя пачка обрабатывается повторно.
+    """
+
+    def __init__(self, func, name, queryset, help):
+        self.func = func
+        self.name = name
+        self.queryset = queryset
+        self.help = help
+
+    def __call__(self, first, last):
+        return self.func(self.queryset.filter(pk__range=(first, last)))
+
+
+def batch_job(name, queryset, help=''):
+    """Регистрирует пересборку name по строкам queryset."""
+    def decorator(func):
+        job = BatchJob(func, name, queryset, help)
+        _jobs[name] = job
+        return job
+    return decorator
+
+
+def jobs():
+    autodiscover_modules('batches')
+    return dict(sorted(_jobs.items()))
+
+
+def ranges(queryset, batch_size, after=0):
+    """
+    Границы пачек (первый pk, последний pk, число строк). Каждая пачка —
+    один запрос по индексу pk, читаются только сами pk.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        batch = list(pks.filter(pk__gt=after)[:batch_size])
+        if not batch:
+            return
+        yield batch[0], batch[-1], len(batch)
+        after = batch[-1]
+
+
+def _run_range(name, first, last):
+    close_old_connections()
+    try:
+        _jobs[name](first, last)
+    finally:
+        close_old_connections()
+
+
+def _run_in_pool(name, batches, pool, workers, done):
+    # Дочерние процессы не должны унаследовать открытые соединения:
+    # закрываем их и запускаем пул, пока родитель не открыл новые.
+    connections.close_all()
+    with POOLS[pool](max_workers=workers) as executor:
+        executor.submit(close_old_connections).result()
+        running = deque()
+        try:
+            for first, last, size in batches:
+                running.append((
+                    executor.submit(_run_range, name, first, last),
+                    last, size,
+                ))
+                # Очередь ограничена: границы всей таблицы
+                # не читаются вперёд обработки.
+                if len(running) >= workers * 2:
+                    future, last, size = running.popleft()
+                    future.result()
+                    done(last, size)
+            for future, last, size in running:
+                future.result()
+                done(last, size)
+        except BaseException:
+            # shutdown(cancel_futures=True) есть только с Python 3.9:
+            # отменяем ждущие пачки сами, выход из with дождётся
+            # уже начатых.
+            for future, _, _ in running:
+                future.cancel()
+            raise
+
+
+def run(name, batch_size=1000, workers=0, pool='process', restart=False,
+        progress=None):
+    """
+    Проходит всю таблицу пересборки name. Незавершённая прошлая
+    пересборка продолжается с точки, если не задан restart.
+    С workers > 0 пачки обрабатываются в пуле из стольких процессов
+    (или потоков), но точка сдвигается строго по порядку пачек.
+    progress(checkpoint, total) вызывается после каждой пачки.
+    Возвращает точку.
+    """
+    job = jobs()[name]
+    checkpoint, _ = Checkpoint.objects.get_or_create(name=name)
+    if restart or checkpoint.finished:
+        checkpoint.position = checkpoint.processed = 0
+        checkpoint.finished = None
+        checkpoint.save()
+    total = checkpoint.processed + job.queryset.filter(
+        pk__gt=checkpoint.position).count()
+
+    def done(last, size):
+        checkpoint.position = last
+        checkpoint.processed += size
+        checkpoint.save(update_fields=['position', 'processed', 'updated'])
+        if progress is not None:
+            progress(checkpoint, total)
+
+    batches = ranges(job.queryset, batch_size, after=checkpoint.position)
+    if workers:
+        _run_in_pool(name, batches, pool, workers, done)
+    else:
+        for first, last, size in batches:
+            job(first, last)
+            done(last, size)
+    checkpoint.finished = timezone.now()
+    checkpoint.save(update_fields=['finished', 'updated'])
+    logger.info('Пересборка %s завершена: %s строк', name,
+                checkpoint.processed)
+    return checkpoint
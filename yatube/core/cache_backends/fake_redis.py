@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+class FakeRedis:
+    """
+    Заглушка клиента Redis в памяти процесса для тестов и локального
+    запуска без сервера. Клиенты с одним адресом делят одно хранилище,
+    как разные процессы делят настоящий сервер.
+    """
+    _servers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, store):
+        self._store = store
+
+    @classmethod
+    def from_url(cls, url):
+        with cls._lock:
+            return cls(cls._servers.setdefault(url, {}))
+
+    def _get(self, name):
+        value, expires = self._store.get(name, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self._store.pop(name, None)
+            return None
+        return value
+
+    def get(self, name):
+        return self._get(name)
+
+    def mget(self, names):
+        return [self._get(name) for name in names]
+
+    def set(self, name, value, px=None, nx=False):
+        with self._lock:
+            if nx and self._get(name) is not None:
+                return None
+            expires = None if px is None else time.monotonic() + px / 1000
+            self._store[name] = (value, expires)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(
+                self._store.pop(name, None) is not None for name in names
+            )
+
+    def exists(self, name):
+        return int(self._get(name) is not None)
+
+    def pexpire(self, name, milliseconds):
+        with self._lock:
+            value = self._get(name)
+            if value is None:
+                return False
+            self._store[name] = (value, time.monotonic() + milliseconds / 1000)
+            return True
+
+    def persist(self, name):
+        with self._lock:
+            value = self._get(name)
+            if value is None:
+                return False
+            self._store[name] = (value, None)
+            return True
+
+    def incrby(self, name, amount=1):
+        with self._lock:
+            value = int(self._get(name) or 0) + amount
+            _, expires = self._store.get(name, (None, None))
+            self._store[name] = (str(value).encode(), expires)
+            return value
+
+    def flushdb(self):
+        with self._lock:
+            self._store.clear()
+            return True
@@ -0,0 +1,116 @@
+import pickle
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class RedisCache(BaseCache):
+    """
+    Кэш в Redis или в любом сервере с тем же протоколом.
+    LOCATION — адрес вида redis://host:6379/0. OPTIONS['CLIENT_CLASS']
+    позволяет подставить другой клиент, например FakeRedis в тестах.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._server = server
+        self._options = params.get('OPTIONS', {})
+
+    @cached_property
+    def _client(self):
+        client_class = self._options.get('CLIENT_CLASS')
+        if client_class:
+            return import_string(client_class).from_url(self._server)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured(
+                'Для CACHE_BACKEND=redis установите пакет redis.'
+            )
+        return redis.Redis.from_url(self._server)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _timeout_ms(self, timeout):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return int(timeout * 1000)
+
+    # Целые числа храним как есть, чтобы работал INCRBY.
+    def _encode(self, value):
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def get(self, key, default=None, version=None):
+        value = self._client.get(self._key(key, version))
+        if value is None:
+            return default
+        return self._decode(value)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        values = self._client.mget(list(keys))
+        return {
+            original: self._decode(value)
+            for original, value in zip(keys.values(), values)
+            if value is not None
+        }
+
+    def _set(self, key, value, timeout, nx=False):
+        timeout = self._timeout_ms(timeout)
+        if timeout is not None and timeout <= 0:
+            if not nx:
+                self._client.delete(key)
+            return False
+        return bool(
+            self._client.set(key, self._encode(value), px=timeout, nx=nx)
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._set(self._key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._set(self._key(key, version), value, timeout, nx=True)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        timeout = self._timeout_ms(timeout)
+        if timeout is None:
+            return bool(self._client.persist(key))
+        return bool(self._client.pexpire(key, timeout))
+
+    def delete(self, key, version=None):
+        self._client.delete(self._key(key, version))
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def has_key(self, key, version=None):
+        return bool(self._client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self._client.exists(key):
+            raise ValueError("Key '%s' not found" % key)
+        return self._client.incrby(key, delta)
+
+    def clear(self):
+        self._client.flushdb()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Ограниченный LRU-кэш в памяти процесса перед общим кэшем.
+
+    Запись живёт локально не дольше OPTIONS['LOCAL_TIMEOUT'] секунд:
+    это верхняя граница того, насколько другой процесс может отстать
+    от изменения. Свои изменения процесс видит сразу. Размер задаётся
+    OPTIONS['MAX_ENTRIES'], общий кэш — OPTIONS['SHARED_ALIAS'].
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED_ALIAS', 'default')
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @property
+    def _shared(self):
+        return caches[self._shared_alias]
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'size': len(self._local),
+                'max_entries': self._max_entries,
+                'local_timeout': self._local_timeout,
+            }
+
+    def _local_get(self, key):
+        with self._lock:
+            value, expires = self._local.get(key, (MISSING, None))
+            if value is not MISSING and expires <= time.monotonic():
+                del self._local[key]
+                value = MISSING
+            if value is MISSING:
+                self._stats['misses'] += 1
+            else:
+                self._local.move_to_end(key)
+                self._stats['hits'] += 1
+            return value
+
+    def _local_set(self, key, value):
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + self._local_timeout)
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def forget(self, key):
+        """Убирает ключ только из локального уровня."""
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        value = self._local_get(key)
+        if value is MISSING:
+            value = self._shared.get(key, MISSING, version=version)
+            if value is MISSING:
+                return default
+            self._local_set(key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._local_get(key)
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self._shared.get_many(missing, version=version)
+            for key, value in shared.items():
+                self._local_set(key, value)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._shared.set(key, value, timeout, version=version)
+        self._local_set(key, value)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._shared.add(key, value, timeout, version=version)
+        if added:
+            self._local_set(key, value)
+        else:
+            self.forget(key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.forget(key)
+        self._shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, MISSING, version=version) is not MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self.forget(key)
+        value = self._shared.incr(key, delta, version=version)
+        self._local_set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self._shared.clear()
@@ -0,0 +1,67 @@
+import random
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+LOCKED = ('database is locked', 'database table is locked')
+
+
+def is_locked(error):
+    return any(message in str(error) for message in LOCKED)
+
+
+@contextmanager
+def busy_timeout(connection, seconds):
+    """Временно меняет время ожидания блокировки SQLite."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    connection.ensure_connection()
+    raw = connection.connection
+    previous = raw.execute('PRAGMA busy_timeout').fetchone()[0]
+    raw.execute(f'PRAGMA busy_timeout = {int(seconds * 1000)}')
+    try:
+        yield
+    finally:
+        raw.execute(f'PRAGMA busy_timeout = {previous}')
+
+
+class RetryAtomic(transaction.Atomic):
+    """
+    atomic, который повторяет только начало транзакции: BEGIN
+    IMMEDIATE ждёт блокировку записи не дольше timeout, затем пауза
+    (растёт вдвое и слегка случайна, чтобы повторы не сталкивались
+    снова) и новая попытка. Ошибка внутри блока не повторяется:
+    код в нём выполняется ровно один раз. Внутри чужой транзакции
+    это обычный atomic.
+    """
+
+    def __init__(self, using, attempts, timeout, delay):
+        super().__init__(using, savepoint=True)
+        self.attempts = attempts
+        self.timeout = timeout
+        self.delay = delay
+
+    def __enter__(self):
+        connection = transaction.get_connection(self.using)
+        if connection.in_atomic_block:
+            return super().__enter__()
+        for attempt in range(self.attempts):
+            try:
+                with busy_timeout(connection, self.timeout):
+                    return super().__enter__()
+            except OperationalError as error:
+                if attempt == self.attempts - 1 or not is_locked(error):
+                    raise
+            time.sleep(self.delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def atomic_retry(using=None, attempts=4, timeout=1.0, delay=0.05):
+    """
+    Как transaction.atomic: декоратор или контекстный менеджер.
+    В худшем случае ждёт около attempts * timeout секунд.
+    """
+    if callable(using):
+        return RetryAtomic(DEFAULT_DB_ALIAS, attempts, timeout, delay)(using)
+    return RetryAtomic(using, attempts, timeout, delay)
@@ -0,0 +1,26 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite для нескольких процессов и потоков сервера.
+
+    OPTIONS['pragmas'] выполняются на каждом новом соединении (WAL,
+    synchronous, mmap_size, cache_size), OPTIONS['timeout'] — сколько
+    ждать чужой блокировки. Транзакция atomic() начинается с
+    BEGIN IMMEDIATE: блокировка записи берётся сразу и ждёт очереди,
+    а не обрывается «database is locked», когда читающая транзакция
+    пытается стать пишущей. Запросы вне atomic() идут в автокоммите
+    и в режиме WAL не ждут пишущих.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn_params = dict(conn_params)
+        pragmas = conn_params.pop('pragmas', {})
+        conn = super().get_new_connection(conn_params)
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,71 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Имя с хэшем содержимого (manifest-статика, картинки постов и их версии)
+# никогда не меняет содержимое, такие файлы можно кэшировать навсегда.
+HASHED_NAME = re.compile(r'[0-9a-f]{8,}\.\w+$')
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def cache_control(path):
+    if HASHED_NAME.search(path):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={settings.FILES_MAX_AGE}'
+
+
+def accepted(request, encoding):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return any(
+        item.split(';')[0].strip() == encoding for item in header.split(',')
+    )
+
+
+def serve(request, path, document_root, accel_prefix=''):
+    """
+    Отдаёт статику или медиа без DEBUG. Файл передаётся через
+    wsgi.file_wrapper (sendfile у gunicorn и uWSGI), а если задан
+    accel_prefix — одним заголовком X-Accel-Redirect, и файл отдаёт
+    nginx. Из статики берётся заранее сжатая копия .br/.gz, если она
+    есть и клиент её принимает.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        response = HttpResponse(status=304)
+    elif accel_prefix:
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + path
+    else:
+        content_type, _ = mimetypes.guess_type(full_path)
+        encoding = None
+        for name, suffix in ENCODINGS:
+            if accepted(request, name) and os.path.isfile(full_path + suffix):
+                encoding, full_path = name, full_path + suffix
+                break
+        response = FileResponse(
+            open(full_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control(path)
+    return response
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from yatube.asgi import application as asgi_application
+
+
+def make_scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+    }
+
+
+def make_environ(path):
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def wsgi_request(application, path):
+    status = []
+    environ = make_environ(path)
+    response = application(
+        environ, lambda line, headers, exc_info=None:
+        status.append(int(line.split()[0]))
+    )
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return status[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI и ASGI (yatube.asgi) '
+        'при одинаковом числе одновременных запросов. Запросы идут '
+        'в приложение напрямую, без сети и HTTP-сервера: видна цена '
+        'самого пути обслуживания.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Адрес для запросов; можно несколько (по кругу).',
+        )
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=16)
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/', '/api/v1/posts/']
+        wsgi = get_wsgi_application()
+        asgi = asgi_application
+        # Первые запросы импортируют модули и наполняют кэши:
+        # в замер они не входят.
+        for path in paths:
+            wsgi_request(wsgi, path)
+        runs = [
+            ('wsgi', lambda: self.run_wsgi(wsgi, paths, options)),
+            ('asgi', lambda: asyncio.run(
+                self.run_asgi(asgi, paths, options))),
+        ]
+        self.stdout.write(
+            f'{"mode":<6}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}'
+            f'{"errors":>8}'
+        )
+        for mode, run in runs:
+            started = time.perf_counter()
+            latencies, errors = run()
+            elapsed = time.perf_counter() - started
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f'{mode:<6}{len(latencies) / elapsed:>10.1f}'
+                f'{statistics.median(latencies) * 1000:>10.2f}'
+                f'{p95 * 1000:>10.2f}{errors:>8}'
+            )
+
+    def run_wsgi(self, application, paths, options):
+        """concurrency потоков, как у многопоточного WSGI-сервера."""
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, errors = [], []
+
+        def worker():
+            while True:
+                with lock:
+                    i = next(counter)
+                if i >= options['requests']:
+                    return
+                started = time.perf_counter()
+                status = wsgi_request(application, paths[i % len(paths)])
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors.append(status)
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            workers = [
+                pool.submit(worker) for _ in range(options['concurrency'])
+            ]
+        for future in workers:
+            future.result()
+        return latencies, len(errors)
+
+    async def run_asgi(self, application, paths, options):
+        """concurrency одновременных соединений к одному циклу событий."""
+        counter = itertools.count()
+        latencies, errors = [], []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def worker():
+            for i in counter:
+                if i >= options['requests']:
+                    return
+                status = []
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+
+                started = time.perf_counter()
+                await application(
+                    make_scope(paths[i % len(paths)]), receive, send
+                )
+                latencies.append(time.perf_counter() - started)
+                if status[0] >= 400:
+                    errors.append(status[0])
+
+        await asyncio.gather(
+            *(worker() for _ in range(options['concurrency']))
+        )
+        return latencies, len(errors)
@@ -0,0 +1,163 @@
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.db import atomic_retry, is_locked
+
+DEFAULT = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {},
+}
+
+
+def read_posts(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            'SELECT id, text FROM bench_post ORDER BY id DESC LIMIT 10'
+        )
+        return cursor.fetchall()
+
+
+def write_post(alias, author_id):
+    # Как в post_create: сначала чтение, потом запись в той же транзакции.
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            'SELECT count(*) FROM bench_post WHERE author_id = %s',
+            [author_id],
+        )
+        cursor.execute(
+            'INSERT INTO bench_post (author_id, text) VALUES (%s, %s)',
+            [author_id, 'new post'],
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка чтения и записи на SQLite из нескольких '
+        'потоков: настройки Django по умолчанию против DATABASES '
+        'проекта (WAL, PRAGMA, BEGIN IMMEDIATE, повторы, постоянные '
+        'соединения). База создаётся во временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--ops', type=int, default=4000,
+                            help='Операций на режим, всего.')
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument(
+            '--dir', default=settings.BASE_DIR,
+            help='Где создать базу: на том же диске, что и рабочая.',
+        )
+
+    def handle(self, *args, **options):
+        tuned = settings.DATABASES['default']
+        if not tuned['ENGINE'].endswith('sqlite3'):
+            raise CommandError('DATABASES["default"] — не SQLite.')
+        modes = [
+            ('default', DEFAULT, False),
+            ('tuned', {
+                'ENGINE': tuned['ENGINE'],
+                'CONN_MAX_AGE': tuned.get('CONN_MAX_AGE', 0),
+                'OPTIONS': tuned.get('OPTIONS', {}),
+            }, True),
+        ]
+        self.stdout.write(
+            f'{"mode":<9}{"ops/s":>9}{"reads/s":>9}{"writes/s":>10}'
+            f'{"failed":>8}{"p95 write ms":>14}'
+        )
+        for name, config, retry in modes:
+            directory = tempfile.mkdtemp(dir=options['dir'])
+            alias = f'benchmark_{name}'
+            connections.databases[alias] = {
+                **config, 'NAME': f'{directory}/bench.sqlite3',
+            }
+            connections.ensure_defaults(alias)
+            connections.prepare_test_settings(alias)
+            try:
+                self.report(name, self.run(alias, retry, options))
+            finally:
+                connections[alias].close()
+                del connections.databases[alias]
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def report(self, name, result):
+        elapsed, reads, writes, failed = result
+        writes.sort()
+        p95 = writes[int(len(writes) * 0.95) - 1] * 1000 if writes else 0
+        self.stdout.write(
+            f'{name:<9}{(reads + len(writes)) / elapsed:>9.0f}'
+            f'{reads / elapsed:>9.0f}{len(writes) / elapsed:>10.0f}'
+            f'{failed:>8}{p95:>14.1f}'
+        )
+
+    def create_table(self, alias, rows):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE bench_post (id INTEGER PRIMARY KEY, '
+                'author_id INTEGER NOT NULL, text TEXT NOT NULL)'
+            )
+            cursor.execute(
+                'CREATE INDEX bench_post_author ON bench_post (author_id)'
+            )
+            cursor.executemany(
+                'INSERT INTO bench_post (author_id, text) VALUES (%s, %s)',
+                [(i % 100, f'post {i}') for i in range(rows)],
+            )
+        connections[alias].close()
+
+    def run(self, alias, retry, options):
+        self.create_table(alias, options['rows'])
+        write = (atomic_retry(using=alias) if retry
+                 else transaction.atomic(using=alias))(write_post)
+
+        lock = threading.Lock()
+        totals = {'reads': 0, 'failed': 0}
+        writes = []
+
+        def worker(count):
+            reads, failed, durations = 0, 0, []
+            for _ in range(count):
+                if random.random() < options['write_ratio']:
+                    started = time.perf_counter()
+                    try:
+                        write(alias, random.randrange(100))
+                    except OperationalError as error:
+                        if not is_locked(error):
+                            raise
+                        failed += 1
+                    else:
+                        durations.append(time.perf_counter() - started)
+                else:
+                    read_posts(alias)
+                    reads += 1
+                # Конец «запроса»: то же, что делает Django по
+                # request_finished.
+                connections[alias].close_if_unusable_or_obsolete()
+            connections[alias].close()
+            with lock:
+                totals['reads'] += reads
+                totals['failed'] += failed
+                writes.extend(durations)
+
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(options['ops'] // options['threads'],),
+            )
+            for _ in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return elapsed, totals['reads'], writes, totals['failed']
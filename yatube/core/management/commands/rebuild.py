@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import batches
+from core.tasks import POOLS
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает производные данные по всей таблице пачками '
+        'с точками возобновления (core.batches).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help='Что пересобрать (по умолчанию — показать список).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Размер пула; 0 — обрабатывать пачки в этом процессе.',
+        )
+        parser.add_argument('--pool', choices=POOLS, default='process')
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать заново, не продолжая прерванную пересборку.',
+        )
+
+    def handle(self, *args, **options):
+        jobs = batches.jobs()
+        if not options['names']:
+            for name, job in jobs.items():
+                self.stdout.write(f'{name}: {job.help}')
+            return
+        unknown = set(options['names']) - set(jobs)
+        if unknown:
+            raise CommandError(
+                'Неизвестные пересборки: ' + ', '.join(sorted(unknown))
+            )
+        for name in options['names']:
+            checkpoint = batches.run(
+                name,
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                pool=options['pool'],
+                restart=options['restart'],
+                progress=self.progress,
+            )
+            self.stdout.write(
+                f'{name}: готово, строк {checkpoint.processed}'
+            )
+
+    def progress(self, checkpoint, total):
+        percent = checkpoint.processed * 100 // total if total else 100
+        self.stdout.write(
+            f'{checkpoint.name}: {checkpoint.processed}/{total} '
+            f'({percent}%), pk {checkpoint.position}'
+        )
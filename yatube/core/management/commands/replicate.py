@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Замена настоящей репликации для локальной проверки: раз '
+        'в --interval секунд копирует default во все DATABASE_REPLICAS '
+        'через SQLite backup API. Реплика обновляется на месте, '
+        'открытые к ней соединения видят новые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true',
+                            help='Скопировать один раз и выйти.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплик нет: задайте DB_REPLICAS.')
+        while True:
+            started = time.monotonic()
+            for alias in settings.DATABASE_REPLICAS:
+                self.copy(alias)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{alias}: скопировано')
+            if options['once']:
+                return
+            time.sleep(max(
+                0, options['interval'] - (time.monotonic() - started)
+            ))
+
+    def copy(self, alias):
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        source.ensure_connection()
+        target.ensure_connection()
+        source.connection.backup(target.connection)
@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import tasks
+from core.tasks import POOLS
+
+
+class Command(BaseCommand):
+    help = 'Фоновый обработчик очереди задач core.Job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pool', choices=POOLS, default=settings.TASKS_POOL,
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.TASKS_CONCURRENCY,
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза при пустой очереди, сек.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить всё, что уже готово, и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        running = {}
+        with POOLS[options['pool']](max_workers=concurrency) as pool:
+            while True:
+                free = concurrency - len(running)
+                started = 0
+                if free:
+                    for job_id in list(tasks.due_jobs(free)):
+                        job = tasks.claim(job_id)
+                        if job is None:
+                            continue
+                        running[pool.submit(tasks.execute, job_id)] = job
+                        started += 1
+                if running:
+                    finished, _ = wait(
+                        running, timeout=options['interval'],
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        self.report(running.pop(future), future)
+                elif options['once']:
+                    break
+                elif not started:
+                    time.sleep(options['interval'])
+
+    def report(self, job, future):
+        try:
+            ok = future.result()
+        except Exception as error:
+            # Упал сам обработчик (например, процесс пула): задача вернётся
+            # в очередь, когда истечёт её срок.
+            self.stderr.write(f'{job}: {error}')
+            return
+        status = 'готово' if ok else 'ошибка'
+        self.stdout.write(f'{job.name} #{job.pk}: {status}')
@@ -0,0 +1,30 @@
+from django.conf import settings
+
+from . import routers
+
+PIN_COOKIE = 'primary'
+
+
+def replica_middleware(get_response):
+    """
+    GET и HEAD читают с реплики. Ответ на запрос, который что-то
+    записал, ставит cookie на DATABASE_REPLICA_LAG секунд: пока она
+    есть, браузер читает из default и видит свои изменения, даже если
+    реплика отстаёт.
+    """
+    def middleware(request):
+        routers.reset()
+        if (request.method in ('GET', 'HEAD')
+                and PIN_COOKIE not in request.COOKIES):
+            routers.use_replica()
+        try:
+            response = get_response(request)
+        finally:
+            wrote = routers.reset()
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_LAG,
+                httponly=True, samesite='Lax',
+            )
+        return response
+    return middleware
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Пересборка')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Последний обработанный pk')),
+                ('processed', models.BigIntegerField(default=0, verbose_name='Обработано строк')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлена')),
+            ],
+            options={
+                'verbose_name': 'Точка пересборки',
+                'verbose_name_plural': 'Точки пересборки',
+            },
+        ),
+    ]
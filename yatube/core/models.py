@@ -11,3 +11,67 @@ class CreatedModel(models.Model):
     class Meta:
 
         abstract = True
+
+
+class Job(CreatedModel):
+    """Отложенная задача для фонового обработчика run_worker."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    dedupe_key = models.CharField(
+        'Ключ для склейки дублей', max_length=200, blank=True, default=''
+    )
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Максимум попыток')
+    run_at = models.DateTimeField('Запустить не раньше')
+    locked_until = models.DateTimeField(
+        'Срок выполнения', blank=True, null=True
+    )
+    finished = models.DateTimeField('Завершена', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='job_status_run_at_idx',
+            ),
+            models.Index(
+                fields=['dedupe_key', 'status'],
+                name='job_dedupe_key_idx',
+            ),
+        ]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class Checkpoint(models.Model):
+    """Докуда дошла пересборка core.batches: с этого pk она продолжится."""
+    name = models.CharField('Пересборка', max_length=100, unique=True)
+    position = models.BigIntegerField('Последний обработанный pk', default=0)
+    processed = models.BigIntegerField('Обработано строк', default=0)
+    finished = models.DateTimeField('Завершена', blank=True, null=True)
+    updated = models.DateTimeField('Обновлена', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Точка пересборки'
+        verbose_name_plural = 'Точки пересборки'
+
+    def __str__(self):
+        return f'{self.name}: pk {self.position}'
@@ -0,0 +1,71 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def use_replica():
+    """
+    Чтения текущего потока (запроса) идут на одну случайную реплику
+    из DATABASE_REPLICAS; без реплик — в default.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    _state.replica = random.choice(replicas) if replicas else None
+
+
+def use_primary():
+    """До конца запроса читать из default."""
+    _state.replica = None
+
+
+@contextmanager
+def primary():
+    replica = getattr(_state, 'replica', None)
+    use_primary()
+    try:
+        yield
+    finally:
+        _state.replica = replica
+
+
+def reset():
+    """Сбрасывает состояние потока; True, если были записи."""
+    wrote = getattr(_state, 'wrote', False)
+    _state.replica = None
+    _state.wrote = False
+    return wrote
+
+
+class ReplicaRouter:
+    """
+    Запись — всегда в default. Чтение — на реплику, только если её
+    выбрал use_replica() (core.middleware.replica_middleware делает это
+    для GET-запросов) и в этом запросе ещё не было записи: дальше
+    запрос читает своё из default. Команды, задачи и пакетные
+    пересчёты реплик не видят.
+    """
+
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'wrote', False):
+            return DEFAULT_DB_ALIAS
+        return getattr(_state, 'replica', None)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема приходит на реплики вместе с данными.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
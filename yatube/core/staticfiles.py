@@ -0,0 +1,54 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.json', '.xml', '.ico',
+                '.map')
+# Файлы меньше одного сетевого пакета сжимать бессмысленно.
+MIN_SIZE = 1024
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic кладёт рядом с каждым файлом копию с хэшем содержимого
+    в имени и готовые сжатые .gz и .br (если установлен brotli):
+    сжатие делается один раз при выкладке, а не на каждый запрос.
+    Файл без записи в манифесте (и даже без самого файла) отдаётся
+    под исходным именем, а не роняет страницу с ValueError.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, done in processed:
+            if not dry_run and done and hashed_name:
+                self.compress(hashed_name)
+            yield name, hashed_name, done
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        path = self.path(name)
+        if os.path.getsize(path) < MIN_SIZE:
+            return
+        with open(path, 'rb') as source:
+            content = source.read()
+        variants = [('.gz', gzip.compress(content, compresslevel=9))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(content):
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
@@ -0,0 +1,40 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранит файл под именем из хэша содержимого:
+    <каталог upload_to>/<2 символа хэша>/<sha256>.<расширение>.
+    Одинаковые загрузки получают одно имя и лежат на диске один раз,
+    а вместе с именем общими становятся и производные версии.
+    Файлы не удаляются при удалении записей: на них могут ссылаться
+    другие записи, см. posts.media.release и gc_media.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Свежая дата изменения защищает файл от удаления, которое
+            # могло решить, что на него больше никто не ссылается.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def hashed_name(name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
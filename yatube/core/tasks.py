@@ -0,0 +1,154 @@
+import json
+import logging
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+POOLS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+class Task:
+    """
+    Обработчик фоновой задачи. Он должен быть идемпотентным: при сбое
+    или истечении срока задача выполняется повторно.
+    """
+
+    def __init__(self, func, name, max_attempts, timeout):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, dedupe_key='', countdown=0, **kwargs):
+        return enqueue(self.name, dedupe_key=dedupe_key,
+                       countdown=countdown, **kwargs)
+
+
+def task(name, max_attempts=5, timeout=60):
+    """Регистрирует функцию как фоновую задачу с именем name."""
+    def decorator(func):
+        handler = Task(func, name, max_attempts, timeout)
+        _handlers[name] = handler
+        return handler
+    return decorator
+
+
+def enqueue(name, dedupe_key='', countdown=0, **kwargs):
+    """
+    Ставит задачу в очередь. Строка пишется в той же транзакции, что и
+    изменение, которое её породило, поэтому задача не потеряется и не
+    выполнится для откаченной записи. Задача с тем же dedupe_key, ещё
+    ждущая в очереди, второй раз не ставится.
+    """
+    handler = _handlers[name]
+    if dedupe_key and Job.objects.filter(
+            dedupe_key=dedupe_key, status=Job.PENDING).exists():
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(kwargs),
+        dedupe_key=dedupe_key,
+        max_attempts=handler.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def due_jobs(limit):
+    """Задачи, которые пора запускать, включая брошенные по сроку."""
+    now = timezone.now()
+    return Job.objects.filter(
+        Q(status=Job.PENDING, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    ).order_by('run_at').values_list('pk', flat=True)[:limit]
+
+
+def claim(job_id):
+    """
+    Захватывает задачу атомарным UPDATE: из нескольких обработчиков
+    задачу получит ровно один. Возвращает задачу или None.
+    """
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None:
+        return None
+    now = timezone.now()
+    if job.name not in _handlers:
+        # Обработчик переименован или удалён: иначе такие строки вечно
+        # стоят первыми в due_jobs и вытесняют остальные задачи.
+        Job.objects.filter(
+            pk=job_id, status__in=[Job.PENDING, Job.RUNNING]
+        ).update(
+            status=Job.FAILED, last_error=f'unknown task: {job.name}',
+            finished=now, locked_until=None,
+        )
+        return None
+    claimed = Job.objects.filter(
+        Q(status=Job.PENDING) | Q(status=Job.RUNNING, locked_until__lt=now),
+        pk=job_id,
+        attempts=job.attempts,
+    ).update(
+        status=Job.RUNNING,
+        attempts=job.attempts + 1,
+        locked_until=now + timedelta(seconds=_handlers[job.name].timeout),
+    )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def execute(job_id):
+    """Выполняет захваченную задачу и записывает результат."""
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            _handlers[job.name](**json.loads(job.payload))
+        except Exception:
+            logger.exception('Задача %s упала', job)
+            fail(job, traceback.format_exc())
+            return False
+        Job.objects.filter(pk=job.pk, attempts=job.attempts).update(
+            status=Job.DONE, finished=timezone.now(), locked_until=None,
+        )
+        return True
+    finally:
+        close_old_connections()
+
+
+def fail(job, error):
+    """Планирует повтор с растущей паузой или помечает задачу проваленной."""
+    changes = {'last_error': error, 'locked_until': None}
+    if job.attempts >= job.max_attempts:
+        changes.update(status=Job.FAILED, finished=timezone.now())
+    else:
+        changes.update(
+            status=Job.PENDING,
+            run_at=timezone.now() + timedelta(seconds=2 ** job.attempts),
+        )
+    Job.objects.filter(pk=job.pk, attempts=job.attempts).update(**changes)
+
+
+def run_pending(limit=100):
+    """Выполняет готовые задачи в текущем потоке. Удобно в тестах."""
+    done = 0
+    for job_id in list(due_jobs(limit)):
+        if claim(job_id) is not None:
+            execute(job_id)
+            done += 1
+    return done
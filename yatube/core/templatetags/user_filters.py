@@ -7,3 +7,12 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **params):
+    """Текущая строка запроса с заменёнными параметрами."""
+    query = context['request'].GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    return query.urlencode()
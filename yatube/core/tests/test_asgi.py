@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from io import StringIO
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from yatube.asgi import application as asgi_application
+from yatube.asgi import thread_per_request
+
+
+class Stream:
+    """Потоковый ответ, который запоминает, в каких потоках его читали."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def __iter__(self):
+        for chunk in (b'one', b'two'):
+            self.threads.add(threading.get_ident())
+            yield chunk
+
+    def close(self):
+        self.threads.add(threading.get_ident())
+
+
+def echo(environ, start_response):
+    """WSGI-приложение, которое возвращает тело запроса."""
+    if environ['PATH_INFO'] == '/stream':
+        start_response('200 OK', [])
+        return echo.stream
+    start_response('201 Created', [
+        ('Content-Type', 'text/plain'),
+        ('X-Cookie', environ.get('HTTP_COOKIE', '')),
+        ('X-Path', environ['PATH_INFO'] + '?' + environ['QUERY_STRING']),
+    ])
+    return [environ['wsgi.input'].read()]
+
+
+class ASGITests(SimpleTestCase):
+    def call(self, application, scope, chunks=(b'',)):
+        messages = [
+            {'type': 'http.request', 'body': chunk, 'more_body': True}
+            for chunk in chunks[:-1]
+        ] + [{'type': 'http.request', 'body': chunks[-1]}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET',
+            'query_string': b'', 'headers': [], **scope,
+        }
+        asyncio.run(application(scope, receive, send))
+        start, *body = sent
+        return start, [message.get('body', b'') for message in body]
+
+    def test_request_is_passed_to_wsgi_application(self):
+        start, body = self.call(thread_per_request(WsgiToAsgi(echo)), {
+            'method': 'POST',
+            'path': '/post',
+            'query_string': b'a=1',
+            'headers': [(b'cookie', b'a=1'), (b'cookie', b'b=2')],
+        }, chunks=(b'hello ', b'world'))
+        self.assertEqual(start['status'], 201)
+        headers = dict(start['headers'])
+        self.assertEqual(headers[b'x-cookie'], b'a=1,b=2')
+        self.assertEqual(headers[b'x-path'], b'/post?a=1')
+        self.assertEqual(b''.join(body), b'hello world')
+
+    def test_response_is_streamed_and_closed_in_request_thread(self):
+        echo.stream = Stream()
+        _, body = self.call(
+            thread_per_request(WsgiToAsgi(echo)), {'path': '/stream'}
+        )
+        self.assertEqual(body, [b'one', b'two', b''])
+        self.assertEqual(len(echo.stream.threads), 1)
+        self.assertNotIn(threading.get_ident(), echo.stream.threads)
+
+    def test_django_page(self):
+        start, body = self.call(asgi_application, {
+            'path': '/about/author/',
+            'headers': [(b'host', b'localhost')],
+        })
+        self.assertEqual(start['status'], 200)
+        self.assertIn('text/html', dict(start['headers'])[b'content-type']
+                      .decode())
+        self.assertIn(b'<html', b''.join(body))
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_serving', '--requests=4',
+                     '--concurrency=2', '--path=/about/author/', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['mode', 'wsgi', 'asgi'])
+        self.assertEqual([line.split()[-1] for line in lines[1:]],
+                         ['0', '0'])
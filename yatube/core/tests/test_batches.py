@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+
+from .. import batches
+
+from ..models import Checkpoint
+
+User = get_user_model()
+
+
+visited = []
+
+
+crash_at = []
+
+
+@batches.batch_job('tests.users', User.objects.all())
+def visit(users):
+    for pk in users.values_list('pk', flat=True):
+        if pk in crash_at:
+            raise RuntimeError(pk)
+        visited.append(pk)
+
+
+class BatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pks = [
+            User.objects.create_user(username=f'user{i}').pk
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        visited.clear()
+        crash_at.clear()
+
+    def test_ranges_cover_table_in_pk_order(self):
+        self.assertEqual(
+            list(batches.ranges(User.objects.all(), 2)),
+            [(self.pks[0], self.pks[1], 2), (self.pks[2], self.pks[3], 2),
+             (self.pks[4], self.pks[4], 1)],
+        )
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        crash_at.append(self.pks[3])
+        reports = []
+        with self.assertRaises(RuntimeError):
+            batches.run('tests.users', batch_size=2,
+                        progress=lambda point, total: reports.append(
+                            (point.processed, total)))
+        self.assertEqual(reports, [(2, 5)])
+        checkpoint = Checkpoint.objects.get(name='tests.users')
+        self.assertEqual(checkpoint.position, self.pks[1])
+        self.assertIsNone(checkpoint.finished)
+
+        crash_at.clear()
+        visited.clear()
+        checkpoint = batches.run('tests.users', batch_size=2)
+        self.assertEqual(visited, self.pks[2:])
+        self.assertEqual(checkpoint.processed, 5)
+        self.assertIsNotNone(checkpoint.finished)
+
+        visited.clear()
+        batches.run('tests.users', batch_size=2)
+        self.assertEqual(visited, self.pks)
+
+
+class RebuildCommandTests(TransactionTestCase):
+    # Пачки обрабатываются в потоках пула со своими соединениями.
+    def setUp(self):
+        visited.clear()
+        crash_at.clear()
+
+    def test_rebuild_in_thread_pool(self):
+        pks = [
+            User.objects.create_user(username=f'user{i}').pk
+            for i in range(7)
+        ]
+        out = StringIO()
+        call_command('rebuild', 'tests.users', '--workers=2',
+                     '--pool=thread', '--batch-size=2', stdout=out)
+        self.assertEqual(sorted(visited), pks)
+        self.assertIn('tests.users: 4/7 (57%)', out.getvalue())
+        self.assertIn('tests.users: готово, строк 7', out.getvalue())
+        out = StringIO()
+        call_command('rebuild', stdout=out)
+        self.assertIn('search: ', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('rebuild', 'nothing')
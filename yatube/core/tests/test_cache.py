@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+
+from ..cache_backends.redis import RedisCache
+from ..cache_backends.sqlite import SQLiteCache
+from ..cache_backends.tiered import TieredCache
+
+User = get_user_model()
+
+
+class SharedCacheBackendTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def get_backends(self):
+        location = os.path.join(self.directory, 'cache.sqlite3')
+        yield 'sqlite', [
+            SQLiteCache(location, {}) for _ in range(2)
+        ]
+        url = f'redis://{self.directory}'
+        options = {'CLIENT_CLASS': 'core.cache_backends.fake_redis.FakeRedis'}
+        yield 'redis', [
+            RedisCache(url, {'OPTIONS': options}) for _ in range(2)
+        ]
+
+    def test_workers_share_entries_and_counters(self):
+        for name, (worker1, worker2) in self.get_backends():
+            with self.subTest(backend=name):
+                worker1.set('page', {'html': 'Привет'})
+                self.assertEqual(worker2.get('page'), {'html': 'Привет'})
+                self.assertTrue(worker1.add('generation', 1, None))
+                self.assertFalse(worker2.add('generation', 5, None))
+                self.assertEqual(worker2.incr('generation'), 2)
+                self.assertEqual(
+                    worker1.get_many(['page', 'generation', 'missing']),
+                    {'page': {'html': 'Привет'}, 'generation': 2},
+                )
+                worker2.delete('page')
+                self.assertIsNone(worker1.get('page'))
+                with self.assertRaises(ValueError):
+                    worker1.incr('missing')
+                worker1.set('expired', 1, timeout=0)
+                self.assertFalse(worker2.has_key('expired'))
+                worker2.clear()
+                self.assertIsNone(worker1.get('generation'))
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        url = f'redis://{id(self)}'
+        shared = {
+            'BACKEND': 'core.cache_backends.redis.RedisCache',
+            'LOCATION': url,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'core.cache_backends.fake_redis.FakeRedis'
+            },
+        }
+        tiered = {
+            'BACKEND': 'core.cache_backends.tiered.TieredCache',
+            'OPTIONS': {
+                'SHARED_ALIAS': 'shared',
+                'MAX_ENTRIES': 2,
+                'LOCAL_TIMEOUT': 60,
+            },
+        }
+        settings_override = self.settings(
+            CACHES={'default': shared, 'shared': shared, 'tiered': tiered}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.shared = caches['shared']
+        self.tiered = TieredCache('', tiered)
+
+    def test_local_hits_misses_and_lru_eviction(self):
+        self.shared.set('group', 'Заголовок')
+        self.assertEqual(self.tiered.get('group'), 'Заголовок')
+        self.shared.set('group', 'Изменён в другом процессе')
+        self.assertEqual(self.tiered.get('group'), 'Заголовок')
+        self.tiered.set('a', 1)
+        self.tiered.set('b', 2)
+        self.assertEqual(
+            self.tiered.get('group'), 'Изменён в другом процессе'
+        )
+        stats = self.tiered.stats()
+        self.assertEqual(
+            [stats[name] for name in ('hits', 'misses', 'evictions', 'size')],
+            [1, 2, 2, 2]
+        )
+
+    def test_incr_in_this_process_is_visible_at_once(self):
+        self.tiered.add('generation', 1, None)
+        self.assertEqual(self.tiered.get('generation'), 1)
+        self.tiered.incr('generation')
+        self.assertEqual(self.tiered.get('generation'), 2)
+        self.assertEqual(self.shared.get('generation'), 2)
+
+    def test_cache_stats_view_is_staff_only(self):
+        self.assertEqual(self.client.get('/cache-stats/').status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/cache-stats/')
+        self.assertIn('hits', response.json())
@@ -0,0 +1,102 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test import TransactionTestCase
+
+from ..db import atomic_retry
+from ..db_backends.sqlite3.base import DatabaseWrapper
+
+
+class SQLiteTests(TransactionTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def wrapper(self):
+        db = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': os.path.join(self.dir, 'db.sqlite3'),
+        })
+        self.addCleanup(db.close)
+        return db
+
+    def test_pragmas_are_applied(self):
+        with self.wrapper().cursor() as cursor:
+            for pragma, value in [('journal_mode', 'wal'),
+                                  ('synchronous', 1),
+                                  ('cache_size', -64 * 1024),
+                                  ('temp_store', 2)]:
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], value)
+
+    def test_transaction_takes_write_lock_at_once(self):
+        db = self.wrapper()
+        db.ensure_connection()
+        db._start_transaction_under_autocommit()
+        self.addCleanup(db.connection.rollback)
+        other = sqlite3.connect(db.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+        # Читать WAL не мешает, вторая пишущая транзакция ждёт.
+        other.execute('SELECT 1').fetchall()
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+    @mock.patch('core.db.time.sleep')
+    def test_atomic_retry_repeats_only_begin(self, sleep):
+        begin = connection._start_transaction_under_autocommit
+        timeouts = []
+
+        def locked_twice():
+            timeouts.append(connection.connection.execute(
+                'PRAGMA busy_timeout').fetchone()[0])
+            if len(timeouts) <= 2:
+                raise OperationalError('database is locked')
+            begin()
+
+        calls = []
+
+        @atomic_retry(timeout=0.5)
+        def body(error=None):
+            calls.append(connection.in_atomic_block)
+            if error:
+                raise OperationalError(error)
+            return 'ok'
+
+        with mock.patch.object(connection,
+                               '_start_transaction_under_autocommit',
+                               side_effect=locked_twice):
+            self.assertEqual(body(), 'ok')
+        self.assertEqual(calls, [True])
+        self.assertEqual(timeouts, [500, 500, 500])
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(connection.connection.execute(
+            'PRAGMA busy_timeout').fetchone()[0], 20000)
+
+        # Ошибка в теле транзакции не повторяется: код мог уже
+        # что-то сделать вне базы.
+        calls.clear()
+        with self.assertRaises(OperationalError):
+            body('database is locked')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sleep.call_count, 2)
+
+        calls.clear()
+        with self.assertRaises(OperationalError), transaction.atomic():
+            body('database is locked')
+        self.assertEqual(len(calls), 1)
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_sqlite', '--ops=40', '--threads=2',
+                     '--rows=10', f'--dir={self.dir}', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['mode', 'default', 'tuned'])
+        self.assertEqual(lines[2].split()[-2], '0')
+        self.assertEqual(os.listdir(self.dir), [])
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from .. import files
+
+from ..staticfiles import CompressedManifestStaticFilesStorage
+
+
+class FileServingTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, 'css'))
+        self.css = 'body { color: red; }\n' * 100
+        self.write('css/site.0123456789ab.css', self.css)
+        self.write('posts/legacy.jpg', 'jpeg')
+        self.factory = RequestFactory()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as target:
+            target.write(content)
+        return path
+
+    def serve(self, path, accel_prefix='', **headers):
+        request = self.factory.get('/static/' + path, **headers)
+        return files.serve(request, path, self.root, accel_prefix)
+
+    def test_hashed_names_are_immutable(self):
+        response = self.serve('css/site.0123456789ab.css')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content),
+                         self.css.encode())
+        response = self.serve('posts/legacy.jpg')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_precompressed_sibling_is_served(self):
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        storage.compress('css/site.0123456789ab.css')
+        response = self.serve('css/site.0123456789ab.css',
+                              HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertLess(int(response['Content-Length']), len(self.css))
+        response = self.serve('css/site.0123456789ab.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_missing_manifest_entry_falls_back_to_original_name(self):
+        storage = CompressedManifestStaticFilesStorage(
+            location=self.root, base_url='/static/'
+        )
+        with self.settings(DEBUG=False):
+            self.assertEqual(storage.url('css/missing.css'),
+                             '/static/css/missing.css')
+
+    def test_not_modified_and_accel_redirect(self):
+        response = self.serve('posts/legacy.jpg')
+        response = self.serve(
+            'posts/legacy.jpg',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.serve('posts/legacy.jpg', '/internal/media/')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/internal/media/posts/legacy.jpg')
+
+    def test_paths_outside_root_are_not_found(self):
+        for path in ('../etc/passwd', 'css', 'missing.css'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self.serve(path)
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from .. import routers
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_LAG=60)
+class ReplicaTests(TransactionTestCase):
+    # Реплика — отдельный файл, который наполняет manage.py replicate.
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        connections.databases['replica'] = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.drop_replica)
+        self.author = User.objects.create_user('replica_author')
+        call_command('replicate', '--once')
+        self.post = Post.objects.create(
+            text='Свежий пост про совиные гнёзда', author=self.author
+        )
+
+    def drop_replica(self):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+
+    def search(self):
+        response = self.client.get(reverse('posts:search'), {'q': 'гнёзда'})
+        return list(response.context['page_obj'])
+
+    def test_get_reads_replica_until_replicated(self):
+        self.assertEqual(self.search(), [])
+        call_command('replicate', '--once')
+        self.assertEqual(self.search(), [self.post])
+
+    def test_own_write_pins_browser_to_primary(self):
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Ещё про гнёзда'}
+        )
+        self.assertEqual(response.cookies['primary']['max-age'], 60)
+        self.assertEqual(len(self.search()), 2)
+        del self.client.cookies['primary']
+        self.assertEqual(self.search(), [])
+
+    def test_recently_changed_page_is_read_from_primary(self):
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.settings(DATABASE_REPLICA_LAG=0):
+            response = self.client.get(url, {'v': 2})
+        self.assertEqual(response.status_code, 404)
+
+    def test_router(self):
+        routers.reset()
+        self.addCleanup(routers.reset)
+        self.assertEqual(router.db_for_read(Post), 'default')
+        routers.use_replica()
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        with routers.primary():
+            self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
@@ -0,0 +1,90 @@
+import os
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .. import tasks
+
+from ..models import Job
+
+
+calls = []
+
+
+@tasks.task('tests.record', max_attempts=2)
+def record(value):
+    calls.append(value)
+    if value == 'boom':
+        raise ValueError(value)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_once_and_duplicates_are_merged(self):
+        record.delay(dedupe_key='one', value=1)
+        record.delay(dedupe_key='one', value=1)
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(tasks.run_pending(), 0)
+        self.assertEqual(calls, [1])
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+
+    def test_claimed_job_cannot_be_claimed_again(self):
+        job = record.delay(value=1)
+        self.assertIsNotNone(tasks.claim(job.pk))
+        self.assertIsNone(tasks.claim(job.pk))
+        self.assertEqual(list(tasks.due_jobs(10)), [])
+
+    def test_unknown_task_is_failed(self):
+        job = Job.objects.create(
+            name='tests.removed', payload='{}', max_attempts=5,
+            run_at=timezone.now(),
+        )
+        self.assertIsNone(tasks.claim(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.last_error, 'unknown task: tests.removed')
+        self.assertEqual(list(tasks.due_jobs(10)), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        job = record.delay(value=1)
+        tasks.claim(job.pk)
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timezone.timedelta(seconds=1)
+        )
+        self.assertEqual(tasks.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 2))
+
+    def test_failed_job_is_retried_with_backoff_then_given_up(self):
+        job = record.delay(value='boom')
+        tasks.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('ValueError', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        tasks.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(calls, ['boom', 'boom'])
+
+
+class RunWorkerTests(TransactionTestCase):
+    # Задачи выполняются в потоках пула со своими соединениями,
+    # поэтому данные теста должны быть закоммичены.
+    def setUp(self):
+        calls.clear()
+
+    def test_run_worker_once(self):
+        for value in range(3):
+            record.delay(value=value)
+        call_command('run_worker', '--once', '--concurrency=1',
+                     stdout=open(os.devnull, 'w'))
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
@@ -1,3 +1,9 @@
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.http import JsonResponse
 from django.shortcuts import render
 
 
@@ -17,3 +23,10 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def cache_stats(request):
+    """Попадания и промахи локального кэша текущего процесса."""
+    cache = caches[settings.GENERATIONS_CACHE_ALIAS]
+    return JsonResponse({'pid': os.getpid(), **cache.stats()})
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Group, Post, Comment, Follow
 
 
@@ -17,6 +18,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту через тот же индекс, что и на сайте."""
+        if not search_term:
+            return queryset, False
+        ids = search.search(search_term).ids()
+        return queryset.filter(pk__in=ids), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
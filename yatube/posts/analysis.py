@@ -0,0 +1,200 @@
+"""
+Анализатор текста для поискового индекса: текст поста и слова запроса
+проходят одну и ту же цепочку фильтров, и в индексе лежат уже
+нормализованные основы слов. Цепочка задаётся настройкой
+SEARCH_ANALYZER — списком путей к фильтрам. Фильтр получает слово
+и возвращает новое слово или None, если слово нужно выбросить.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+try:
+    import Stemmer
+except ImportError:
+    Stemmer = None
+
+WORD = re.compile(r'\w+')
+
+STOPWORDS = frozenset('''
+    а без более бы был была были было быть в вам вас весь во вот все
+    всего всех вы где да даже для до его ее ей ему если есть еще же за
+    здесь и из или им их к как ко когда кто ли либо мне может мы на над
+    надо наш не него нее нет ни них но ну о об однако он она они оно от
+    очень по под при с со так также такой там те тем то того тоже той
+    только том ты у уже хотя чего чей чем что чтобы чье чья эта эти это
+    я
+'''.split())
+
+
+def lowercase(word):
+    return word.lower()
+
+
+def fold_yo(word):
+    """«ё» пишут не всегда: «ещё» и «еще» должны совпадать."""
+    return word.replace('ё', 'е')
+
+
+def drop_stopwords(word):
+    return None if word in STOPWORDS else word
+
+
+# Префикс запроса «по*» может оказаться стоп-словом, хотя ищут
+# «погоду», поэтому к префиксам этот фильтр не применяется.
+drop_stopwords.whole_words_only = True
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    if Stemmer is not None:
+        return _pystemmer().stemWord(word)
+    return stem_russian(word)
+
+
+@lru_cache(maxsize=None)
+def _pystemmer():
+    return Stemmer.Stemmer('russian')
+
+
+class Analyzer:
+    def __init__(self, filters):
+        self.filters = filters
+
+    def __call__(self, text):
+        """Основы слов текста для индекса."""
+        words = (self.word(word) for word in WORD.findall(text))
+        return [word for word in words if word]
+
+    def word(self, word, prefix=False):
+        for word_filter in self.filters:
+            if prefix and getattr(word_filter, 'whole_words_only', False):
+                continue
+            word = word_filter(word)
+            if not word:
+                return None
+        return word
+
+
+def get_analyzer():
+    return _load_analyzer(tuple(settings.SEARCH_ANALYZER))
+
+
+@lru_cache(maxsize=None)
+def _load_analyzer(paths):
+    return Analyzer([import_string(path) for path in paths])
+
+
+def analyze(text):
+    return ' '.join(get_analyzer()(text))
+
+
+# Стеммер Портера для русского языка по описанию Snowball
+# (snowballstem.org/algorithms/russian/stemmer.html). Все окончания
+# ищутся в области RV — после первой гласной слова.
+
+VOWELS = 'аеиоуыэюя'
+
+
+def _endings(after_a, plain):
+    """Окончания от длинных к коротким с признаком «после а/я»."""
+    endings = [(ending, True) for ending in after_a]
+    endings += [(ending, False) for ending in plain]
+    return sorted(endings, key=lambda item: len(item[0]), reverse=True)
+
+
+PERFECTIVE_GERUND = _endings(
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = _endings(
+    (),
+    ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+     'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+     'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = _endings(
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = _endings((), ('ся', 'сь'))
+VERB = _endings(
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = _endings(
+    (),
+    ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+     'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+     'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+     'ья', 'я'),
+)
+SUPERLATIVE = _endings((), ('ейш', 'ейше'))
+DERIVATIONAL = _endings((), ('ост', 'ость'))
+
+
+def _region(word, start):
+    """Начало области после первой пары «гласная, согласная»."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(word, limit, endings):
+    """
+    Отрезает самое длинное из окончаний, целиком лежащее после limit.
+    Окончания первой группы отрезаются, только если перед ними «а»
+    или «я»; сама буква остаётся. Без подходящего окончания — None.
+    """
+    for ending, after_a in endings:
+        start = len(word) - len(ending)
+        if start < limit or not word.endswith(ending):
+            continue
+        if not after_a or start > limit and word[start - 1] in 'ая':
+            return word[:start]
+        return None
+    return None
+
+
+def stem_russian(word):
+    word = fold_yo(word)
+    rv = next(
+        (i + 1 for i, letter in enumerate(word) if letter in VOWELS),
+        len(word),
+    )
+    r2 = _region(word, _region(word, 0))
+
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        stripped = _strip(word, rv, ADJECTIVE)
+        if stripped is not None:
+            stripped = _strip(stripped, rv, PARTICIPLE) or stripped
+        else:
+            stripped = _strip(word, rv, VERB)
+            if stripped is None:
+                stripped = _strip(word, rv, NOUN)
+    word = stripped if stripped is not None else word
+
+    if word.endswith('и') and len(word) > rv:
+        word = word[:-1]
+
+    word = _strip(word, max(r2, rv), DERIVATIONAL) or word
+
+    if word.endswith('нн') and len(word) - 1 > rv:
+        word = word[:-1]
+    else:
+        stripped = _strip(word, rv, SUPERLATIVE)
+        if stripped is not None:
+            word = stripped
+            if word.endswith('нн') and len(word) - 1 > rv:
+                word = word[:-1]
+        elif word.endswith('ь') and len(word) > rv:
+            word = word[:-1]
+    return word
@@ -0,0 +1,45 @@
+import logging
+
+from core.batches import batch_job
+
+from . import search, stats, timeline
+from .models import Follow, Post, User
+from .renditions import pending, render
+
+logger = logging.getLogger(__name__)
+
+
+@batch_job('search', Post.objects.all(),
+           help='Поисковый индекс постов.')
+def reindex(posts):
+    search.index_posts(posts)
+
+
+@batch_job('user_stats', User.objects.all(),
+           help='Счётчики постов, подписок и комментариев пользователей.')
+def recount_users(users):
+    stats.recount(users)
+
+
+@batch_job('post_stats', Post.objects.all(),
+           help='Число и время последнего комментария у постов.')
+def recount_posts(posts):
+    stats.recount_posts(posts)
+
+
+@batch_job('timelines', Follow.objects.all(),
+           help='Материализованные ленты подписок.')
+def fill_timelines(follows):
+    for user_id, author_id in follows.values_list('user_id', 'author_id'):
+        timeline.backfill(user_id, author_id)
+
+
+@batch_job('renditions', pending(),
+           help='Версии картинок постов, которые ещё не готовы.')
+def render_renditions(posts):
+    for post_id in posts.values_list('pk', flat=True):
+        try:
+            render(post_id)
+        except (OSError, ValueError):
+            # Битая картинка не должна останавливать пересборку.
+            logger.exception('Пост %s: не удалось нарезать версии', post_id)
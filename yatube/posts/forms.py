@@ -1,6 +1,10 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
-from .models import Post, Comment
+from .lookups import find_author
+from .models import Comment, Group, Post
+from .uploads import OversizedUpload, normalize
 
 
 class PostForm(forms.ModelForm):
@@ -20,6 +24,32 @@ class PostForm(forms.ModelForm):
             'group': 'Группа, к которой будет относиться пост',
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Содержимое слишком большого файла отброшено при загрузке,
+        # поэтому убираем его до проверки полем ImageField.
+        self.oversized_image = None
+        if isinstance(self.files.get('image'), OversizedUpload):
+            self.files = self.files.copy()
+            self.oversized_image = self.files.pop('image')[0]
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        max_size = settings.POST_IMAGE_MAX_UPLOAD_SIZE
+        uploaded = self.oversized_image or self.files.get('image')
+        if uploaded is None:
+            return image
+        if uploaded.size > max_size:
+            raise forms.ValidationError(
+                'Файл больше %s.' % filesizeformat(max_size)
+            )
+        width, height = image.image.size
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                'Слишком большое разрешение: %s×%s.' % (width, height)
+            )
+        return normalize(image)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -28,3 +58,21 @@ class CommentForm(forms.ModelForm):
         widgets = {
             'text': forms.Textarea(attrs={'class': 'form-control'}),
         }
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Запрос', max_length=200)
+    group = forms.ModelChoiceField(
+        Group.objects.all(), to_field_name='slug', required=False,
+        label='Группа', empty_label='Все группы',
+    )
+    author = forms.CharField(label='Автор', max_length=150, required=False)
+
+    def clean_author(self):
+        username = self.cleaned_data['author']
+        if not username:
+            return None
+        author = find_author(username)
+        if author is None:
+            raise forms.ValidationError('Такого пользователя нет.')
+        return author
@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Post
+
+
+def generations_cache(shared=False):
+    """
+    Поколения читаются на каждом запросе, поэтому идут через локальный
+    уровень кэша процесса. shared=True — мимо него, из общего кэша:
+    локальная копия может отставать от записи в другом процессе.
+    """
+    alias = settings.GENERATIONS_CACHE_ALIAS
+    if shared:
+        options = settings.CACHES[alias].get('OPTIONS', {})
+        alias = options.get('SHARED_ALIAS', alias)
+    return caches[alias]
+
+
+def generation_key(scope, pk=None):
+    return f'generation:{scope}:{pk}'
+
+
+def modified_key(scope, pk=None):
+    return f'modified:{scope}:{pk}'
+
+
+def _initial_generation():
+    # Начинаем не с единицы, а со времени: если счётчик вытеснят
+    # из кэша, он не вернётся к значению, под которым лежат старые страницы.
+    return int(time.time() * 1000)
+
+
+def get_generations(scopes):
+    """Текущие поколения для списка областей [(scope, pk), ...]."""
+    return get_validators(scopes)[0]
+
+
+def get_validators(scopes, shared=False):
+    """
+    Поколения областей и время последнего изменения любой из них
+    (timestamp) — одним запросом к кэшу. Если время потерялось,
+    считаем, что изменение было только что: это лишь отменит 304.
+    """
+    generations = generations_cache(shared)
+    keys = [generation_key(*scope) for scope in scopes]
+    times = [modified_key(*scope) for scope in scopes]
+    values = generations.get_many(keys + times)
+    for key in keys:
+        if key not in values:
+            generations.add(key, _initial_generation(), None)
+            values[key] = generations.get(key)
+    now = time.time()
+    for key in times:
+        if key not in values:
+            generations.add(key, now, None)
+            values[key] = now
+    return [values[key] for key in keys], max(values[key] for key in times)
+
+
+def bump(scope, pk=None):
+    """Делает устаревшими все страницы, зависящие от области."""
+    generations = generations_cache()
+    key = generation_key(scope, pk)
+    if not generations.add(key, _initial_generation(), None):
+        try:
+            generations.incr(key)
+        except ValueError:
+            generations.set(key, _initial_generation(), None)
+    generations.set(modified_key(scope, pk), time.time(), None)
+
+
+def post_changed(post, group_ids=()):
+    """Пост создан, изменён или удалён."""
+    bump('global')
+    bump('post', post.pk)
+    bump('author', post.author_id)
+    for group_id in {post.group_id, *group_ids} - {None}:
+        bump('group', group_id)
+
+
+def comment_changed(comment):
+    post = Post.objects.filter(
+        pk=comment.post_id).values_list('author_id', 'group_id').first()
+    bump('global')
+    bump('post', comment.post_id)
+    if post is not None:
+        author_id, group_id = post
+        bump('author', author_id)
+        if group_id is not None:
+            bump('group', group_id)
+
+
+def follow_changed(follow):
+    bump('author', follow.author_id)
+    bump('author', follow.user_id)
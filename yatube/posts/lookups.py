@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+
+from core.routers import primary
+
+from .models import Group, Post, User
+from .generations import get_generations
+
+
+def _find(key, scope, fetch):
+    """
+    Объект из кэша процесса, если его поколение не изменилось
+    с момента кэширования; иначе — из основной базы: отставшая
+    реплика закэшировала бы старый объект под новым поколением.
+    """
+    cache = caches[settings.GENERATIONS_CACHE_ALIAS]
+    cached = cache.get(key)
+    if cached is not None:
+        generation, obj = cached
+        if get_generations([(scope, obj.pk)]) == [generation]:
+            return obj
+    with primary():
+        obj = fetch()
+    if obj is not None:
+        generation, = get_generations([(scope, obj.pk)])
+        cache.set(key, (generation, obj), settings.LOOKUP_CACHE_TIMEOUT)
+    return obj
+
+
+def find_group(slug):
+    return _find(
+        f'lookup:group:{slug}', 'group',
+        lambda: Group.objects.filter(slug=slug).first(),
+    )
+
+
+def find_author(username):
+    return _find(
+        f'lookup:author:{username}', 'author',
+        lambda: User.objects.select_related('stats').filter(
+            username=username).first(),
+    )
+
+
+def find_post(post_id):
+    """Только id автора и группы: для областей страницы поста."""
+    return _find(
+        f'lookup:post:{post_id}', 'post',
+        lambda: Post.objects.filter(pk=post_id).only(
+            'pk', 'author_id', 'group_id').first(),
+    )
+
+
+def get_group_or_404(slug):
+    group = find_group(slug)
+    if group is None:
+        raise Http404('Группа не найдена.')
+    return group
+
+
+def get_author_or_404(username):
+    author = find_author(username)
+    if author is None:
+        raise Http404('Пользователь не найден.')
+    return author
@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.timeline import follow_feed
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает раскладку постов при записи (push) и подмешивание '
+        'при чтении (pull): усиление записи и задержку чтения ленты. '
+        'Все данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--followers', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=20)
+        parser.add_argument('--reads', type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                results = [
+                    self.run(mode, options) for mode in ('push', 'pull')
+                ]
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(
+            f'{"mode":<6}{"rows/post":>12}{"write ms/post":>16}'
+            f'{"read ms/page":>15}'
+        )
+        for mode, rows, write_ms, read_ms in results:
+            self.stdout.write(
+                f'{mode:<6}{rows:>12.1f}{write_ms:>16.2f}{read_ms:>15.2f}'
+            )
+
+    def run(self, mode, options):
+        followers = options['followers']
+        author = User.objects.create_user(username=f'bench_{mode}_author')
+        User.objects.bulk_create(
+            User(username=f'bench_{mode}_{i}') for i in range(followers)
+        )
+        readers = User.objects.filter(
+            username__startswith=f'bench_{mode}_'
+        ).exclude(pk=author.pk)
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=author) for reader in readers
+        )
+        reader = readers.first()
+        limit = followers if mode == 'push' else 0
+        # Раскладка в том же запросе, а не в фоновой задаче: иначе
+        # замер записи — это одна вставка задачи.
+        with override_settings(TIMELINE_FANOUT_LIMIT=limit,
+                               TIMELINE_SYNC_FANOUT_LIMIT=limit):
+            rows_before = TimelineEntry.objects.count()
+            started = time.perf_counter()
+            for i in range(options['posts']):
+                Post.objects.create(author=author, text=f'bench {i}')
+            write_ms = (time.perf_counter() - started) * 1000
+            rows = TimelineEntry.objects.count() - rows_before
+            started = time.perf_counter()
+            for _ in range(options['reads']):
+                list(follow_feed(reader).for_feed()[:10])
+            read_ms = (time.perf_counter() - started) * 1000
+        return (
+            mode,
+            rows / options['posts'],
+            write_ms / options['posts'],
+            read_ms / options['reads'],
+        )
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Group, Post, User
+from posts.timeline import follow_feed
+
+
+class Command(BaseCommand):
+    help = 'Печатает план выполнения запросов каждой ленты и страницы поста.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Пользователь для profile и follow_index '
+                 '(по умолчанию — первый с подписками).',
+        )
+        parser.add_argument(
+            '--group',
+            help='Слаг группы для group_posts (по умолчанию — первая).',
+        )
+
+    def get_queries(self, options):
+        per_page = settings.POSTS_PER_PAGE
+        user = (
+            User.objects.filter(username=options['username']).first()
+            if options['username']
+            else User.objects.filter(follower__isnull=False).first()
+        ) or User.objects.first()
+        group = (
+            Group.objects.filter(slug=options['group']).first()
+            if options['group'] else Group.objects.first()
+        )
+        post = Post.objects.first()
+        queries = {'index': Post.objects.for_feed()[:per_page]}
+        if group is not None:
+            queries['group_posts'] = group.posts.for_feed()[:per_page]
+        if user is not None:
+            queries['profile'] = user.posts.for_feed()[:per_page]
+            queries['follow_index'] = follow_feed(user).for_feed()[:per_page]
+        if post is not None:
+            queries['post_detail'] = Comment.objects.for_display().filter(
+                post=post)
+        return queries
+
+    def handle(self, *args, **options):
+        for name, queryset in self.get_queries(options).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from posts.media import delete_image, image_storage, orphans
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов и их версии, на которые больше '
+        'не ссылается ни один пост.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60,
+            help='Не трогать файлы моложе стольких минут.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+
+    def handle(self, *args, **options):
+        grace = timedelta(minutes=options['grace'])
+        originals = image_storage()
+        removed = 0
+        for storage, name in list(orphans(grace)):
+            self.stdout.write(name)
+            removed += 1
+            if options['dry_run']:
+                continue
+            if storage is originals:
+                delete_image(name)
+            else:
+                storage.delete(name)
+        verb = 'К удалению' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {removed}')
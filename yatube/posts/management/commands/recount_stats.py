@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import User
+from posts.stats import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики пользователей и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи для пересчёта (по умолчанию — все).',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        fixed = recount(users, batch_size=options['batch_size'])
+        self.stdout.write(f'Исправлено строк статистики: {fixed}')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.renditions import pending, render
+
+
+class Command(BaseCommand):
+    help = (
+        'Готовит версии картинок постов, которые ещё не обработаны. '
+        'Новые загрузки обрабатывает run_worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересобрать версии у всех постов с картинками.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='') if options['all'] else pending()
+        failed = 0
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            try:
+                render(post_id)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Пост {post_id}: {error}')
+            else:
+                self.stdout.write(f'Пост {post_id}: готово')
+        self.stdout.write(f'С ошибками: {failed}')
@@ -0,0 +1,112 @@
+import json
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from sorl.thumbnail import default as thumbnails
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+from .renditions import FORMATS, rendition_name, rendition_size
+
+RENDITIONS_DIR = 'posts/renditions'
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def is_fresh(storage, name, grace):
+    """Файл изменён недавно: его могут прямо сейчас начать использовать."""
+    return storage.get_modified_time(name) > timezone.now() - grace
+
+
+def rendition_names(image_name):
+    return [
+        rendition_name(image_name, rendition_size(width), fmt)
+        for width in settings.POST_IMAGE_WIDTHS for fmt in FORMATS
+    ]
+
+
+def delete_image(name):
+    """Удаляет оригинал, его версии и миниатюры sorl."""
+    storage = image_storage()
+    thumbnails.kvstore.delete_thumbnails(ImageFile(name, storage))
+    for path in rendition_names(name):
+        default_storage.delete(path)
+    storage.delete(name)
+
+
+def release(name, grace=timedelta(minutes=10)):
+    """
+    Пост перестал ссылаться на картинку. Файлы общие для всех постов
+    с тем же содержимым, поэтому удаляются, только когда ссылок
+    не осталось и файл не загружали заново в последние grace.
+    """
+    storage = image_storage()
+    try:
+        if not name or not storage.exists(name):
+            return False
+    except SuspiciousFileOperation:
+        return False
+    if Post.objects.filter(image=name).exists():
+        return False
+    if is_fresh(storage, name, grace):
+        return False
+    delete_image(name)
+    return True
+
+
+def walk(storage, directory):
+    """Все файлы каталога хранилища, включая вложенные."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from walk(storage, posixpath.join(directory, subdirectory))
+
+
+def referenced():
+    """Имена оригиналов и версий, на которые ссылаются посты."""
+    images, renditions = set(), set()
+    prefix = default_storage.base_url
+    posts = Post.objects.exclude(image='').values_list('image', 'renditions')
+    for image, data in posts.iterator():
+        images.add(image)
+        if not data:
+            # Версии ещё готовятся: их файлы могут уже лежать на диске.
+            renditions.update(rendition_names(image))
+            continue
+        data = json.loads(data)
+        srcsets = [data.get('srcset', '')] + [
+            source['srcset'] for source in data.get('sources', [])
+        ]
+        for srcset in filter(None, srcsets):
+            for item in srcset.split(', '):
+                url = item.split()[0]
+                if url.startswith(prefix):
+                    renditions.add(url[len(prefix):])
+    return images, renditions
+
+
+def orphans(grace):
+    """
+    Оригиналы и версии, на которые не ссылается ни один пост:
+    пары (хранилище, имя).
+    """
+    images, renditions = referenced()
+    storage = image_storage()
+    for name in walk(storage, 'posts'):
+        if name.startswith(RENDITIONS_DIR + '/'):
+            continue
+        if name not in images and not is_fresh(storage, name, grace):
+            yield storage, name
+    for name in walk(default_storage, RENDITIONS_DIR):
+        if (name not in renditions
+                and not is_fresh(default_storage, name, grace)):
+            yield default_storage, name
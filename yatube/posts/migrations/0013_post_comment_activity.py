@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:10
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_activity(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    Post = apps.get_model('posts', 'Post')
+    comments = Comment.objects.filter(
+        post_id=OuterRef('pk')).order_by().values('post_id')
+    Post.objects.update(
+        comments_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total'),
+                     output_field=models.IntegerField()),
+            0,
+        ),
+        last_commented_at=Subquery(
+            comments.annotate(last=Max('created')).values('last'),
+            output_field=models.DateTimeField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_userstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='last_commented_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний комментарий'),
+        ),
+        migrations.RunPython(fill_comment_activity, migrations.RunPython.noop),
+    ]
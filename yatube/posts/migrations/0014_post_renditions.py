@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_comment_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='renditions',
+            field=models.TextField(blank=True, default='', editable=False, help_text='JSON: {имя: {url, width, height}}', verbose_name='Версии картинки'),
+        ),
+    ]
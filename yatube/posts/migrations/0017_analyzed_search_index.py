@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def recreate_search_index(apps, schema_editor):
+    # В индексе теперь основы слов после posts.analysis: диакритику
+    # больше не снимаем, иначе «й» превращалась в «и». Таблица
+    # создаётся пустой, чтобы миграция не зависела от кода
+    # анализатора: заполняет её posts.search.reindex_if_empty после
+    # migrate (или manage.py rebuild search).
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+        "text, group_id UNINDEXED, author_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 0', prefix = '2 3')"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_search_index, migrations.RunPython.noop),
+    ]
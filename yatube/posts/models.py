@@ -1,7 +1,12 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.functional import cached_property
 from django.db.models import UniqueConstraint
 
+from core.storage import ContentAddressedStorage
+
 
 User = get_user_model()
 
@@ -16,6 +21,13 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+
+    def for_feed(self):
+        """Всё, что шаблоны ленты читают у поста, одним запросом."""
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
 
     text = models.TextField(
@@ -43,18 +55,67 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
-        blank=True
+        storage=ContentAddressedStorage(),
+        blank=True,
+        db_index=True,
+    )
+    comments_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False
     )
+    last_commented_at = models.DateTimeField(
+        'Последний комментарий',
+        blank=True, null=True,
+        editable=False
+    )
+    renditions = models.TextField(
+        'Версии картинки',
+        blank=True, default='',
+        editable=False,
+        help_text='JSON: {имя: {url, width, height}}'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
 
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
         return self.text
 
+    @cached_property
+    def image_renditions(self):
+        """
+        Готовые версии картинки (см. renditions.render). Записи старого
+        формата без srcset считаются необработанными.
+        """
+        data = json.loads(self.renditions) if self.renditions else {}
+        return data if 'srcset' in data else {}
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def for_display(self):
+        return self.select_related('author')
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
@@ -66,8 +127,16 @@ class Comment(models.Model):
     text = models.TextField(verbose_name='Текст')
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -84,9 +153,60 @@ class Follow(models.Model):
                                verbose_name='Подписка на автора')
 
     class Meta:
-        constraints = UniqueConstraint(
-            fields=['user', 'author'],
-            name='unique_following',
-        )
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_following',
+            ),
+        ]
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+
+
+class TimelineEntry(models.Model):
+    """
+    Материализованная лента подписок: по записи на каждый пост
+    каждого автора, на которого подписан пользователь.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='timeline',
+                             verbose_name='Читатель')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='timeline_entries',
+                             verbose_name='Пост')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='+',
+                               verbose_name='Автор поста')
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_post',
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='stats',
+                                verbose_name='Пользователь')
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    comments_count = models.PositiveIntegerField('Комментариев', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
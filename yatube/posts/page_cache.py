@@ -0,0 +1,145 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+
+from core import routers
+from core.middleware import PIN_COOKIE
+
+from .generations import get_validators
+from .lookups import find_author, find_group, find_post
+
+
+def cache_page_versioned(get_scopes):
+    """
+    Версионирует страницу поколениями областей, от которых она зависит:
+    get_scopes(**kwargs) возвращает [(scope, pk), ...] или None, если
+    страницу версионировать не нужно.
+
+    По поколениям строится ETag, а по времени их изменения —
+    Last-Modified, так что клиент с актуальной копией получает 304
+    ещё до выборки данных и рендеринга. Анонимам страница целиком
+    отдаётся из кэша.
+
+    Страницы, области которых менялись не раньше чем
+    DATABASE_REPLICA_LAG секунд назад, строятся из основной базы.
+    Вошедшим и только что писавшим поколения читаются из общего кэша:
+    локальная копия процесса могла не увидеть их запись в другом
+    процессе и подтвердить 304 старую страницу.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            scopes = get_scopes(**kwargs)
+            if scopes is None:
+                return view(request, *args, **kwargs)
+            anonymous = not request.user.is_authenticated
+            generations, modified = get_validators(
+                scopes, shared=not anonymous or PIN_COOKIE in request.COOKIES
+            )
+            read_fresh(modified)
+            generations = '.'.join(map(str, generations))
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            etag = page_etag(request, view.__name__, path, generations)
+            last_modified = page_last_modified(anonymous, modified)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+            if not anonymous or request.method != 'GET':
+                response = view(request, *args, **kwargs)
+            else:
+                key = f'page:{view.__name__}:{path}:{generations}'
+                response = cache.get(key)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                    if response.status_code == 200 and not response.cookies:
+                        cache.set(key, response,
+                                  settings.PAGE_CACHE_TIMEOUT)
+            if response.status_code == 200:
+                set_validators(response, etag, last_modified)
+                patch_cache_control(response, no_cache=True,
+                                    private=not anonymous)
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapper
+    return decorator
+
+
+def read_fresh(modified):
+    """
+    Реплика может ещё не знать о недавнем изменении, а страница
+    и ETag будут под новым поколением: такие страницы читают default.
+    """
+    if time.time() - modified < settings.DATABASE_REPLICA_LAG:
+        routers.use_primary()
+
+
+def page_last_modified(anonymous, modified):
+    """
+    Last-Modified только для анонимов: у вошедшего пользователя
+    страница своя, и сверять её можно лишь по ETag. В заголовке
+    целые секунды, поэтому изменение текущей секунды сверяется только
+    по ETag: следующее изменение в ту же секунду дало бы тот же
+    заголовок и ложный 304 на If-Modified-Since.
+    """
+    if not anonymous or time.time() - modified < 1:
+        return None
+    return math.ceil(modified)
+
+
+def page_etag(request, name, path, generations):
+    """
+    У вошедшего пользователя в ETag входят его id и CSRF-cookie:
+    страница отличается шапкой и токенами форм.
+    """
+    variant = ''
+    if request.user.is_authenticated:
+        csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+        variant = f'{request.user.pk}:{csrf}'
+    raw = f'{name}:{path}:{generations}:{variant}'
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def index_scopes():
+    return [('global',)]
+
+
+def group_scopes(slug):
+    group = find_group(slug)
+    if group is None:
+        return None
+    return [('group', group.pk)]
+
+
+def profile_scopes(username):
+    author = find_author(username)
+    if author is None:
+        return None
+    return [('author', author.pk)]
+
+
+def post_scopes(post_id):
+    post = find_post(post_id)
+    if post is None:
+        return None
+    return [
+        ('post', post.pk), ('author', post.author_id),
+        ('group', post.group_id),
+    ]
@@ -0,0 +1,140 @@
+import base64
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_cursor(obj, field='pub_date'):
+    """
+    Кодирует позицию записи (дата, id) в непрозрачный токен.
+    Запись — объект модели или словарь из values() с ключом pk.
+    """
+    if isinstance(obj, dict):
+        value, pk = obj[field], obj['pk']
+    else:
+        value, pk = getattr(obj, field), obj.pk
+    raw = f'{value.isoformat()}{CURSOR_SEPARATOR}{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Возвращает пару (дата, id) из токена.
+    Для пустого или битого токена возвращает None.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit(CURSOR_SEPARATOR, 1)
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class CursorPage(Page):
+    """
+    Страница курсорной пагинации. Не знает ни номера, ни общего
+    количества страниц, зато не требует COUNT(*) и OFFSET.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], self.paginator.field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], self.paginator.field)
+        return None
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация по паре (field, id) в порядке убывания.
+    Время выборки любой страницы не зависит от размера таблицы,
+    если по (field, id) есть индекс. key — поле с тем же значением,
+    что и id, по которому сортировать: например, столбец таблицы,
+    на индекс которой опирается выборка.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date', key='pk'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.field = field
+        self.key = key
+
+    def _older(self, cursor):
+        value, pk = cursor
+        return (Q(**{f'{self.field}__lt': value})
+                | Q(**{self.field: value, f'{self.key}__lt': pk}))
+
+    def _newer(self, cursor):
+        value, pk = cursor
+        return (Q(**{f'{self.field}__gt': value})
+                | Q(**{self.field: value, f'{self.key}__gt': pk}))
+
+    def page(self, after=None, before=None):
+        limit = self.per_page + 1
+        if before is not None:
+            items = list(
+                self.object_list.filter(self._newer(before))
+                .order_by(self.field, self.key)[:limit]
+            )
+            has_previous = len(items) > self.per_page
+            items = items[:self.per_page][::-1]
+            return CursorPage(items, self, True, has_previous)
+        queryset = self.object_list.order_by(
+            f'-{self.field}', f'-{self.key}'
+        )
+        if after is not None:
+            queryset = queryset.filter(self._older(after))
+        items = list(queryset[:limit])
+        return CursorPage(
+            items[:self.per_page], self,
+            len(items) > self.per_page, after is not None
+        )
+
+
+def get_page(request, object_list, per_page=None, field='pub_date',
+             key='pk'):
+    """
+    Возвращает страницу ленты для запроса.
+    Курсорный режим включается токенами ?after=/?before= или настройкой
+    POSTS_PAGINATION = 'cursor', иначе работает обычный ?page=N.
+    """
+    per_page = per_page or settings.POSTS_PER_PAGE
+    after = decode_cursor(request.GET.get('after'))
+    before = decode_cursor(request.GET.get('before'))
+    if after or before or settings.POSTS_PAGINATION == 'cursor':
+        return CursorPaginator(object_list, per_page, field, key).page(
+            after=after, before=before
+        )
+    return Paginator(object_list, per_page).get_page(request.GET.get('page'))
@@ -0,0 +1,121 @@
+import hashlib
+import json
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from . import generations
+from .models import Post
+
+
+def pending():
+    """
+    Посты, картинки которых ещё ждут обработки. Запрос не тратит на это
+    время: версии готовит фоновая задача posts.render_renditions.
+    """
+    return Post.objects.exclude(image='').filter(renditions='')
+
+
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'image/jpeg',
+             {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def available_formats():
+    """Форматы из POST_IMAGE_FORMATS, которые умеет записать Pillow."""
+    return [
+        fmt for fmt in settings.POST_IMAGE_FORMATS
+        if fmt == 'jpeg' or features.check(fmt)
+    ]
+
+
+def rendition_size(width):
+    ratio_width, ratio_height = settings.POST_IMAGE_RATIO
+    return width, round(width * ratio_height / ratio_width)
+
+
+def share(post):
+    """
+    Берёт готовые версии у другого поста с той же картинкой: имя файла
+    — хэш содержимого, так что и версии у них общие.
+    """
+    ready = Post.objects.filter(image=post.image.name).exclude(
+        renditions=''
+    ).values_list('renditions', flat=True).first()
+    if not ready:
+        return False
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        renditions=ready
+    )
+    post.renditions = ready
+    return True
+
+
+def rendition_name(image_name, size, fmt):
+    digest = hashlib.md5(image_name.encode()).hexdigest()[:8]
+    width, height = size
+    return f'posts/renditions/{width}x{height}_{digest}.{fmt}'
+
+
+def save_rendition(image, path, size, fmt):
+    if default_storage.exists(path):
+        return path
+    pil_format, _, options = FORMATS[fmt]
+    buffer = BytesIO()
+    ImageOps.fit(image, size, Image.LANCZOS).save(
+        buffer, pil_format, **options
+    )
+    return default_storage.save(path, ContentFile(buffer.getvalue()))
+
+
+def render(post_id):
+    """
+    Нарезает картинку поста по ширинам POST_IMAGE_WIDTHS во всех
+    доступных форматах и сохраняет в посте готовые srcset для <picture>.
+    Последний формат — запасной для <img>. Возвращает описание версий.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return {}
+    with post.image.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = image.convert('RGB')
+    widths = sorted(settings.POST_IMAGE_WIDTHS)
+    sources = []
+    for fmt in available_formats():
+        urls = []
+        for width in widths:
+            size = rendition_size(width)
+            path = save_rendition(
+                image, rendition_name(post.image.name, size, fmt), size, fmt
+            )
+            urls.append(default_storage.url(path))
+        sources.append({
+            'type': FORMATS[fmt][1],
+            'srcset': ', '.join(
+                f'{url} {width}w' for url, width in zip(urls, widths)
+            ),
+            'src': urls[-1],
+        })
+    fallback = sources.pop()
+    width, height = rendition_size(widths[-1])
+    renditions = {
+        'width': width,
+        'height': height,
+        'src': fallback['src'],
+        'srcset': fallback['srcset'],
+        'sources': sources,
+    }
+    # Картинку могли заменить, пока шла обработка: тогда не трогаем пост.
+    updated = Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        renditions=json.dumps(renditions)
+    )
+    if updated:
+        generations.post_changed(post)
+    return renditions
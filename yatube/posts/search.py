@@ -0,0 +1,138 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import router
+from django.utils.module_loading import import_string
+
+from core.batches import ranges
+
+from .analysis import analyze, get_analyzer
+from .models import Post
+
+Term = namedtuple('Term', 'word prefix')
+# Пост в том виде, в каком он попадает в индекс: text — основы слов.
+Document = namedtuple('Document', 'id text group_id author_id')
+
+WORD = re.compile(r'(\w+)(\*?)')
+MAX_TERMS = 10
+
+
+def get_backend():
+    return _load_backend(settings.SEARCH_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def parse_query(query):
+    """
+    Разбирает строку запроса на термины. Все слова обязательны;
+    «слово*» ищется по префиксу, последнее слово — всегда по префиксу,
+    чтобы находилось ещё не дописанное. Слова проходят тот же
+    анализатор, что и тексты постов; стоп-слова выбрасываются.
+    """
+    words = WORD.findall(query)[:MAX_TERMS]
+    analyzer = get_analyzer()
+    terms = []
+    for i, (word, star) in enumerate(words):
+        # Стоп-слово со звёздочкой — явно заданный префикс, его
+        # оставляем; последнее слово без звёздочки — нет: «о погоде и».
+        word = analyzer.word(word, prefix=bool(star))
+        if word:
+            terms.append(Term(word, bool(star) or i == len(words) - 1))
+    return terms
+
+
+class SearchResults:
+    """
+    Результаты поиска для Paginator: считает и выбирает посты
+    страницами, в порядке релевантности.
+    """
+
+    def __init__(self, terms, group_id=None, author_id=None):
+        self.terms = terms
+        self.filters = {'group_id': group_id, 'author_id': author_id}
+        self._count = None
+
+    def count(self):
+        if not self.terms:
+            return 0
+        if self._count is None:
+            self._count = get_backend().count(self.terms, **self.filters)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, offset=0, limit=None):
+        if not self.terms:
+            return []
+        return get_backend().search(
+            self.terms, offset=offset, limit=limit, **self.filters
+        )
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        limit = None if key.stop is None else key.stop - start
+        ids = self.ids(start, limit)
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search(query, group_id=None, author_id=None):
+    return SearchResults(parse_query(query), group_id, author_id)
+
+
+def document(post_id, text, group_id, author_id):
+    return Document(post_id, analyze(text), group_id, author_id)
+
+
+def index(post):
+    get_backend().index(
+        [document(post.pk, post.text, post.group_id, post.author_id)]
+    )
+
+
+def remove(post_id):
+    get_backend().remove(post_id)
+
+
+def index_posts(posts):
+    """Индексирует посты одной пачкой."""
+    rows = posts.order_by('pk').values_list(
+        'pk', 'text', 'group_id', 'author_id'
+    )
+    documents = [document(*row) for row in rows]
+    get_backend().index(documents)
+    return len(documents)
+
+
+def reindex(posts=None, batch_size=500):
+    """
+    Заново индексирует посты пачками по pk. Пересборка с точками
+    возобновления и пулом — manage.py rebuild search.
+    Возвращает число проиндексированных постов.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    return sum(
+        index_posts(posts.filter(pk__range=(first, last)))
+        for first, last, _ in ranges(posts, batch_size)
+    )
+
+
+def reindex_if_empty(using, **kwargs):
+    """
+    После migrate (сигнал post_migrate) заполняет индекс, который
+    миграция создала пустым, если посты уже есть.
+    """
+    if using != router.db_for_write(Post) or not get_backend().is_empty():
+        return
+    if Post.objects.using(using).exists():
+        reindex()
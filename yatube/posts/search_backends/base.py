@@ -0,0 +1,24 @@
+class BaseSearchBackend:
+    """
+    Поисковый индекс постов. Посты приходят пачками search.Document
+    с уже обработанным анализатором текстом, запрос — списком
+    терминов search.Term; search() возвращает id постов по убыванию
+    релевантности, фильтры по группе и автору применяются в индексе.
+    """
+
+    def index(self, documents):
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        raise NotImplementedError
+
+    def is_empty(self):
+        """Индекс есть, но в нём ничего нет (например, после миграции)."""
+        return False
+
+    def search(self, terms, group_id=None, author_id=None,
+               offset=0, limit=None):
+        raise NotImplementedError
+
+    def count(self, terms, group_id=None, author_id=None):
+        raise NotImplementedError
@@ -0,0 +1,46 @@
+import re
+
+from posts.models import Post
+
+from .base import BaseSearchBackend
+
+
+def pattern(word):
+    return re.escape(word).replace('е', '[её]')
+
+
+class SimpleBackend(BaseSearchBackend):
+    """
+    Поиск подстрокой без индекса, для баз без полнотекстового поиска.
+    Каждая основа слова должна встретиться в тексте, сначала новые посты.
+    Термины приходят после анализатора, а текст в базе — исходный:
+    основа сверяется без учёта регистра (и для кириллицы, чего не
+    умеет icontains на SQLite) и с «е» на месте «ё». Основа Snowball —
+    начало словоформы, так что другие формы слова тоже находятся.
+    """
+
+    def index(self, documents):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def _filter(self, terms, group_id, author_id):
+        posts = Post.objects.all()
+        for term in terms:
+            posts = posts.filter(text__iregex=pattern(term.word))
+        if group_id is not None:
+            posts = posts.filter(group_id=group_id)
+        if author_id is not None:
+            posts = posts.filter(author_id=author_id)
+        return posts
+
+    def search(self, terms, group_id=None, author_id=None,
+               offset=0, limit=None):
+        ids = self._filter(terms, group_id, author_id).order_by(
+            '-pub_date', '-pk').values_list('pk', flat=True)
+        end = None if limit is None else offset + limit
+        return list(ids[offset:end])
+
+    def count(self, terms, group_id=None, author_id=None):
+        return self._filter(terms, group_id, author_id).count()
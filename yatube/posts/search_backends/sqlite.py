@@ -0,0 +1,85 @@
+from django.db import connections, router
+
+from posts.models import Post
+
+from .base import BaseSearchBackend
+
+TABLE = 'posts_post_fts'
+
+
+class FTS5Backend(BaseSearchBackend):
+    """
+    Инвертированный индекс SQLite FTS5 (таблица создаётся миграциями
+    0016_post_search_index и 0017_analyzed_search_index). rowid строки
+    индекса — id поста, группа и автор хранятся рядом как
+    неиндексируемые столбцы для фильтров.
+    Сортировка по bm25: чем реже слово и короче пост, тем выше.
+    """
+
+    def _cursor(self, write=False):
+        if write:
+            alias = router.db_for_write(Post)
+        else:
+            alias = router.db_for_read(Post)
+        return connections[alias].cursor()
+
+    @staticmethod
+    def match(terms):
+        # Слова уже очищены до \w+, в кавычках они не станут операторами.
+        return ' '.join(
+            f'"{term.word}"' + ('*' if term.prefix else '') for term in terms
+        )
+
+    def _where(self, terms, group_id, author_id):
+        sql = [f'{TABLE} MATCH %s']
+        params = [self.match(terms)]
+        if group_id is not None:
+            sql.append('group_id = %s')
+            params.append(group_id)
+        if author_id is not None:
+            sql.append('author_id = %s')
+            params.append(author_id)
+        return ' AND '.join(sql), params
+
+    def index(self, documents):
+        if not documents:
+            return
+        with self._cursor(write=True) as cursor:
+            cursor.executemany(
+                f'DELETE FROM {TABLE} WHERE rowid = %s',
+                [[document.id] for document in documents],
+            )
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (rowid, text, group_id, author_id) '
+                f'VALUES (%s, %s, %s, %s)',
+                [list(document) for document in documents],
+            )
+
+    def remove(self, post_id):
+        with self._cursor(write=True) as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+    def is_empty(self):
+        alias = router.db_for_write(Post)
+        if TABLE not in connections[alias].introspection.table_names():
+            return False
+        with self._cursor(write=True) as cursor:
+            cursor.execute(f'SELECT 1 FROM {TABLE} LIMIT 1')
+            return cursor.fetchone() is None
+
+    def search(self, terms, group_id=None, author_id=None,
+               offset=0, limit=None):
+        where, params = self._where(terms, group_id, author_id)
+        sql = (f'SELECT rowid FROM {TABLE} WHERE {where} '
+               f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s')
+        params += [-1 if limit is None else limit, offset]
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, terms, group_id=None, author_id=None):
+        where, params = self._where(terms, group_id, author_id)
+        with self._cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {TABLE} WHERE {where}',
+                           params)
+            return cursor.fetchone()[0]
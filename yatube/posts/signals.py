@@ -0,0 +1,104 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import generations, renditions, search, stats, tasks, timeline
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    # При смене группы устаревает и страница прежней группы,
+    # при смене картинки — её готовые версии: пост снова встаёт
+    # в очередь на обработку (см. tasks.schedule_renditions).
+    instance._previous_group_id = None
+    instance._previous_image = ''
+    instance._image_changed = bool(instance.image)
+    if not instance._state.adding:
+        previous = Post.objects.filter(
+            pk=instance.pk).values_list('group_id', 'image').first()
+        if previous is not None:
+            instance._previous_group_id, instance._previous_image = previous
+            instance._image_changed = (
+                instance._previous_image != instance.image.name
+            )
+    if instance._image_changed:
+        instance.renditions = ''
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    # bulk_create не шлёт post_save: такие посты попадут в ленты
+    # только при следующей подписке на автора.
+    if created:
+        tasks.fan_out(instance)
+        stats.bump(instance.author_id, posts_count=1)
+    search.index(instance)
+    if getattr(instance, '_image_changed', False):
+        if instance.image and not renditions.share(instance):
+            tasks.schedule_renditions(instance)
+        tasks.release_image(getattr(instance, '_previous_image', ''))
+    generations.post_changed(
+        instance, [getattr(instance, '_previous_group_id', None)]
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    search.remove(instance.pk)
+    tasks.release_image(instance.image.name)
+    stats.bump(instance.author_id, create=False, posts_count=-1)
+    generations.post_changed(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        tasks.fill_timeline(instance)
+        stats.bump(instance.author_id, followers_count=1)
+        stats.bump(instance.user_id, following_count=1)
+        generations.follow_changed(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.prune(instance.user_id, instance.author_id)
+    stats.bump(instance.author_id, create=False, followers_count=-1)
+    stats.bump(instance.user_id, create=False, following_count=-1)
+    tasks.follower_removed(instance)
+    generations.follow_changed(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        stats.comment_added(instance)
+        stats.bump(instance.author_id, comments_count=1)
+    generations.comment_changed(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    stats.comment_removed(instance)
+    stats.bump(instance.author_id, create=False, comments_count=-1)
+    generations.comment_changed(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    generations.bump('global')
+    generations.bump('group', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login, на страницах его нет.
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    generations.bump('global')
+    generations.bump('author', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    generations.bump('author', instance.pk)
@@ -0,0 +1,134 @@
+from django.db.models import (Count, F, IntegerField, Max, OuterRef,
+                              Subquery)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserStats
+
+COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+    'comments_count': (Comment, 'author'),
+}
+
+
+def stats_for(user):
+    """
+    Счётчики пользователя. Строка статистики, которой ещё нет,
+    создаётся пересчётом при первом обращении.
+    """
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        recount(User.objects.filter(pk=user.pk))
+        return UserStats.objects.get(user=user)
+
+
+def bump(user_id, create=True, **deltas):
+    """
+    Сдвигает счётчики пользователя через F(), без чтения строки.
+    Если строки ещё нет, она считается заново целиком. Разошедшийся
+    с данными счётчик не уходит ниже нуля: поля неотрицательные.
+    """
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{name: Greatest(F(name) + delta, 0)
+           for name, delta in deltas.items()}
+    )
+    if not updated and create:
+        recount(User.objects.filter(pk=user_id))
+
+
+def comment_added(comment):
+    """Обновляет счётчик и время последнего комментария поста."""
+    Post.objects.filter(pk=comment.post_id).update(
+        comments_count=F('comments_count') + 1,
+        last_commented_at=comment.created,
+    )
+
+
+def comment_removed(comment):
+    Post.objects.filter(pk=comment.post_id).update(
+        comments_count=Greatest(F('comments_count') - 1, 0),
+        last_commented_at=Subquery(
+            Comment.objects.filter(post_id=OuterRef('pk')).order_by()
+            .values('post_id').annotate(last=Max('created'))
+            .values('last')
+        ),
+    )
+
+
+def _count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recount(users=None, batch_size=500):
+    """
+    Пересчитывает счётчики пользователей и исправляет расхождения.
+    Возвращает число созданных или исправленных строк.
+    """
+    if users is None:
+        users = User.objects.all()
+    users = users.select_related('stats').order_by('pk').annotate(
+        **{f'actual_{name}': _count(*source)
+           for name, source in COUNTERS.items()}
+    )
+    to_create, to_update = [], []
+    fixed = 0
+    for user in users.iterator(chunk_size=batch_size):
+        actual = {
+            name: getattr(user, f'actual_{name}') for name in COUNTERS
+        }
+        stats = getattr(user, 'stats', None)
+        if stats is None:
+            to_create.append(UserStats(user_id=user.pk, **actual))
+        elif any(getattr(stats, name) != value
+                 for name, value in actual.items()):
+            for name, value in actual.items():
+                setattr(stats, name, value)
+            to_update.append(stats)
+        if len(to_create) + len(to_update) >= batch_size:
+            fixed += _flush(to_create, to_update)
+            to_create, to_update = [], []
+    return fixed + _flush(to_create, to_update)
+
+
+def recount_posts(posts, batch_size=500):
+    """
+    Пересчитывает число и время последнего комментария у постов
+    и исправляет расхождения. Возвращает число исправленных постов.
+    """
+    comments = Comment.objects.filter(post_id=OuterRef('pk')).order_by(
+    ).values('post_id')
+    posts = posts.order_by('pk').only(
+        'pk', 'comments_count', 'last_commented_at'
+    ).annotate(
+        actual_count=_count(Comment, 'post'),
+        actual_last=Subquery(
+            comments.annotate(last=Max('created')).values('last')
+        ),
+    )
+    to_update = []
+    for post in posts.iterator(chunk_size=batch_size):
+        if (post.comments_count, post.last_commented_at) != (
+                post.actual_count, post.actual_last):
+            post.comments_count = post.actual_count
+            post.last_commented_at = post.actual_last
+            to_update.append(post)
+    Post.objects.bulk_update(
+        to_update, ['comments_count', 'last_commented_at'],
+        batch_size=batch_size,
+    )
+    return len(to_update)
+
+
+def _flush(to_create, to_update):
+    UserStats.objects.bulk_create(to_create, ignore_conflicts=True)
+    UserStats.objects.bulk_update(to_update, list(COUNTERS))
+    return len(to_create) + len(to_update)
@@ -0,0 +1,87 @@
+from django.conf import settings
+
+from core.tasks import task
+
+from . import media, timeline
+from .models import Follow, Post
+from .renditions import render
+
+
+@task('posts.render_renditions', timeout=120)
+def render_renditions(post_id):
+    render(post_id)
+
+
+@task('posts.release_image')
+def release(image_name):
+    media.release(image_name)
+
+
+@task('posts.push_post')
+def push_post(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'author_id', 'pub_date').first()
+    if post is not None:
+        timeline.push_post(post)
+
+
+@task('posts.backfill')
+def backfill(user_id, author_id):
+    # Пока задача ждала очереди, пользователь мог отписаться.
+    if Follow.objects.filter(user_id=user_id, author_id=author_id).exists():
+        timeline.backfill(user_id, author_id)
+
+
+@task('posts.materialize')
+def materialize(author_id):
+    timeline.materialize(author_id)
+
+
+def fan_out(post):
+    """
+    Раскладывает пост по лентам сразу, если подписчиков немного,
+    иначе отдаёт раскладку фоновому обработчику.
+    """
+    followers = timeline.followers_count(post.author_id)
+    if followers <= settings.TIMELINE_SYNC_FANOUT_LIMIT:
+        timeline.push_post(post)
+    else:
+        push_post.delay(dedupe_key=f'push:{post.pk}', post_id=post.pk)
+
+
+def fill_timeline(follow):
+    """То же для ленты нового подписчика: мелкий автор — сразу."""
+    posts = Post.objects.filter(author_id=follow.author_id).count()
+    if posts <= settings.TIMELINE_SYNC_FANOUT_LIMIT:
+        timeline.backfill(follow.user_id, follow.author_id)
+    else:
+        backfill.delay(
+            dedupe_key=f'backfill:{follow.user_id}:{follow.author_id}',
+            user_id=follow.user_id, author_id=follow.author_id,
+        )
+
+
+def follower_removed(follow):
+    """
+    Автор опустился до TIMELINE_FANOUT_LIMIT подписчиков: follow_feed
+    перестаёт подтягивать его посты, поэтому посты, написанные, пока
+    автор был «тяжёлым», раскладываются по лентам подписчиков.
+    """
+    followers = timeline.followers_count(follow.author_id)
+    if followers == settings.TIMELINE_FANOUT_LIMIT:
+        materialize.delay(
+            dedupe_key=f'materialize:{follow.author_id}',
+            author_id=follow.author_id,
+        )
+
+
+def schedule_renditions(post):
+    render_renditions.delay(
+        dedupe_key=f'renditions:{post.pk}', post_id=post.pk
+    )
+
+
+def release_image(name):
+    """Картинка больше не нужна этому посту: проверим, нужна ли другим."""
+    if name:
+        release.delay(dedupe_key=f'release:{name}', image_name=name)
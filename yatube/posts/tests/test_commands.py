@@ -0,0 +1,112 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import (Comment, Follow, Group, Post, TimelineEntry,
+                      UserStats)
+
+User = get_user_model()
+
+
+class CommandsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Albus')
+        cls.author = User.objects.create_user(username='Severus')
+        cls.group = Group.objects.create(title='Заголовок', slug='tesg')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Test'
+        )
+        Comment.objects.create(post=cls.post, author=cls.user, text='Hi')
+
+    def test_explain_feeds_prints_plan_for_every_view(self):
+        out = StringIO()
+        call_command('explain_feeds', stdout=out)
+        output = out.getvalue()
+        for name in ('index', 'group_posts', 'profile', 'follow_index',
+                     'post_detail'):
+            with self.subTest(name=name):
+                self.assertIn(name, output)
+        self.assertIn('post_group_pub_date_idx', output)
+
+    def test_follow_feed_is_one_index_range_scan(self):
+        out = StringIO()
+        call_command('explain_feeds', '--username=Albus', stdout=out)
+        plan = out.getvalue().split('follow_index')[1].split('post_detail')[0]
+        self.assertIn('timeline_user_pub_date_post', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_benchmark_fanout_counts_pushed_rows(self):
+        out = StringIO()
+        call_command('benchmark_fanout', '--followers=150', '--posts=2',
+                     '--reads=1', stdout=out)
+        rows = {
+            line.split()[0]: float(line.split()[1])
+            for line in out.getvalue().splitlines()[1:]
+        }
+        self.assertEqual(rows, {'push': 150.0, 'pull': 0.0})
+        self.assertFalse(User.objects.filter(username__startswith='bench_'))
+
+    def test_counters_follow_writes(self):
+        author = UserStats.objects.get(user=self.author)
+        user = UserStats.objects.get(user=self.user)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (1, 1)
+        )
+        self.assertEqual(
+            (user.following_count, user.comments_count), (1, 1)
+        )
+        Follow.objects.filter(user=self.user).delete()
+        self.post.delete()
+        author.refresh_from_db()
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (0, 0)
+        )
+
+    def test_drifted_counters_do_not_go_negative(self):
+        UserStats.objects.filter(user=self.author).update(
+            posts_count=0, followers_count=0
+        )
+        Post.objects.update(comments_count=0)
+        Comment.objects.all().delete()
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        author = UserStats.objects.get(user=self.author)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (0, 0)
+        )
+
+    def test_recount_stats_repairs_drift(self):
+        UserStats.objects.filter(user=self.author).update(
+            posts_count=42, followers_count=0
+        )
+        out = StringIO()
+        call_command('recount_stats', stdout=out)
+        self.assertIn('Исправлено строк статистики: 1', out.getvalue())
+        author = UserStats.objects.get(user=self.author)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (1, 1)
+        )
+
+    def test_rebuild_repairs_counters_and_timelines(self):
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        Post.objects.update(comments_count=0, last_commented_at=None)
+        TimelineEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild', 'user_stats', 'post_stats', 'timelines',
+                     'renditions', stdout=out)
+        self.assertIn('post_stats: готово, строк 1', out.getvalue())
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).posts_count, 1
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            post.last_commented_at, Comment.objects.get().created
+        )
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.user, post=post).exists())
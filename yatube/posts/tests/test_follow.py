@@ -2,7 +2,10 @@ from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from ..models import Group, Post, Follow
+from core.models import Job
+from core.tasks import run_pending
+
+from ..models import Group, Post, Follow, TimelineEntry
 
 User = get_user_model()
 
@@ -81,3 +84,85 @@ class FollowTests(TestCase):
         self.assertEqual(
             response.context['page_obj'][0], self.us03.posts.first()
         )
+
+    def test_new_post_pushed_to_follower_timeline(self):
+        Follow.objects.create(user=self.us02, author=self.us03)
+        post = Post.objects.create(author=self.us03, text='Fan-out')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.us02, post=post).exists()
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists()
+        )
+
+    def test_follow_backfills_and_unfollow_prunes_timeline(self):
+        self.authorized_client2.get(
+            reverse('posts:profile_follow', kwargs={'username': self.user})
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.us02).count(),
+            self.user.posts.count()
+        )
+        self.authorized_client2.get(
+            reverse('posts:profile_unfollow', kwargs={'username': self.user})
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.us02).exists())
+
+    def test_follow_index_reads_timeline(self):
+        Follow.objects.create(user=self.us02, author=self.user)
+        TimelineEntry.objects.filter(post=self.first_post).delete()
+        response = self.authorized_client2.get(reverse('posts:follow_index'))
+        self.assertNotIn(self.first_post, response.context['page_obj'])
+        self.assertEqual(
+            len(response.context['page_obj']), self.user.posts.count() - 1
+        )
+
+    def test_high_follower_author_posts_merged_at_read_time(self):
+        Follow.objects.create(user=self.us02, author=self.us03)
+        pushed = Post.objects.create(author=self.us03, text='Pushed')
+        with self.settings(TIMELINE_FANOUT_LIMIT=0):
+            Follow.objects.create(user=self.us02, author=self.user)
+            pulled = Post.objects.create(author=self.user, text='Pulled')
+            self.assertFalse(
+                TimelineEntry.objects.filter(author=self.user).exists()
+            )
+            response = self.authorized_client2.get(
+                reverse('posts:follow_index')
+            )
+        page = list(response.context['page_obj'])
+        self.assertEqual(page[0], pulled)
+        self.assertIn(pushed, page)
+        self.assertEqual(len(page), 7)
+
+    def test_author_back_under_limit_gets_pulled_posts_pushed(self):
+        with self.settings(TIMELINE_FANOUT_LIMIT=1):
+            Follow.objects.create(user=self.us02, author=self.us03)
+            Follow.objects.create(user=self.user, author=self.us03)
+            pulled = Post.objects.create(author=self.us03, text='Pulled')
+            self.assertFalse(
+                TimelineEntry.objects.filter(post=pulled).exists()
+            )
+            Follow.objects.filter(user=self.user).delete()
+            self.assertEqual(run_pending(), 1)
+            response = self.authorized_client2.get(
+                reverse('posts:follow_index')
+            )
+        self.assertIn(pulled, response.context['page_obj'])
+
+    def test_large_fan_out_is_deferred_to_worker(self):
+        Follow.objects.create(user=self.us02, author=self.us03)
+        with self.settings(TIMELINE_SYNC_FANOUT_LIMIT=0):
+            post = Post.objects.create(author=self.us03, text='Deferred')
+            Follow.objects.create(user=self.us03, author=self.user)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertFalse(TimelineEntry.objects.filter(user=self.us03).exists())
+        self.assertEqual(
+            set(Job.objects.values_list('name', flat=True)),
+            {'posts.push_post', 'posts.backfill'},
+        )
+        Follow.objects.filter(user=self.us03).delete()
+        self.assertEqual(run_pending(), 2)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.us02, post=post).exists()
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.us03).exists())
@@ -1,13 +1,25 @@
+import hashlib
+import os
 import shutil
 import tempfile
+import time
+from io import BytesIO, StringIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from core.models import Job
+from core.tasks import run_pending
+
+from ..media import rendition_names as renditions_of
 from ..models import Group, Post, Comment
+from ..renditions import available_formats
 
 User = get_user_model()
 
@@ -104,13 +116,13 @@ class PostCreateFormTests(TestCase):
         )
         self.assertRedirects(response, reverse(
             'posts:profile', kwargs={'username': self.user}))
-        self.assertTrue(
-            Post.objects.filter(
-                text=form_data.get('text'),
-                group=form_data.get('group'),
-                image=f'posts/{uploaded.name}'
-            ).exists()
+        post = Post.objects.get(
+            text=form_data.get('text'),
+            group=form_data.get('group'),
         )
+        with post.image.open('rb') as stored:
+            digest = hashlib.sha256(stored.read()).hexdigest()
+        self.assertEqual(post.image.name, f'posts/{digest[:2]}/{digest}.gif')
         self.assertEqual(Post.objects.count(), self.posts_count + 1)
 
     def test_able_to_comment_post(self):
@@ -131,3 +143,200 @@ class PostCreateFormTests(TestCase):
                 post=Post.objects.first().pk).exists()
         )
         self.assertContains(response, form_data.get('text'), status_code=200)
+
+    def test_comment_updates_post_activity(self):
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Коммент'},
+        )
+        self.post.refresh_from_db()
+        comment = self.post.comments.get()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(self.post.last_commented_at, comment.created)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+        self.assertIsNone(self.post.last_commented_at)
+
+    def test_image_renditions_are_stored_on_post(self):
+        post = Post.objects.create(
+            author=self.user,
+            text='Картинка',
+            image=SimpleUploadedFile('pic.png', self.make_png((1200, 800))),
+        )
+        self.assertEqual(post.renditions, '')
+        self.assertEqual(run_pending(), 1)
+        post = Post.objects.get(pk=post.pk)
+        image = post.image_renditions
+        self.assertEqual((image['width'], image['height']), (960, 339))
+        self.assertEqual(
+            [item.split()[-1] for item in image['srcset'].split(', ')],
+            [f'{width}w' for width in settings.POST_IMAGE_WIDTHS],
+        )
+        self.assertTrue(image['src'].endswith('.jpeg'))
+        self.assertEqual(
+            [source['type'] for source in image['sources']],
+            [f'image/{fmt}' for fmt in available_formats()[:-1]],
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, f'srcset="{image["srcset"]}"')
+        self.assertContains(response, 'width="960" height="339"')
+        post.image = SimpleUploadedFile('new.png', self.make_png((50, 50)))
+        post.save()
+        self.assertEqual(post.renditions, '')
+        self.assertTrue(
+            Job.objects.filter(name='posts.render_renditions',
+                               status=Job.PENDING).exists()
+        )
+
+    def test_unreadable_image_still_renders_thumbnail(self):
+        post = Post.objects.create(
+            author=self.user, text='Старая картинка', image='posts/gone.gif'
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, '<img class="card-img my-2"')
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_uploaded_image_is_rotated_downscaled_and_stripped(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # повёрнут на 90° по часовой
+        exif[0x010F] = 'Camera'
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200), (0, 90, 200)).save(
+            buffer, 'JPEG', exif=exif.tobytes()
+        )
+        with self.settings(POST_IMAGE_MAX_SIDE=100):
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                data={
+                    'text': 'Фото с телефона',
+                    'image': SimpleUploadedFile('phone.jpg',
+                                                buffer.getvalue()),
+                },
+            )
+        post = Post.objects.get(text='Фото с телефона')
+        with post.image.open('rb') as stored:
+            image = Image.open(stored)
+            self.assertEqual(image.size, (50, 100))
+            self.assertNotIn('exif', image.info)
+
+    def test_png_exif_is_stripped(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'SecretCamera'
+        buffer = BytesIO()
+        Image.new('RGB', (40, 20), (0, 90, 200)).save(
+            buffer, 'PNG', exif=exif.tobytes()
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'PNG с EXIF',
+                'image': SimpleUploadedFile('shot.png', buffer.getvalue()),
+            },
+        )
+        post = Post.objects.get(text='PNG с EXIF')
+        with post.image.open('rb') as stored:
+            data = stored.read()
+        self.assertNotIn(b'SecretCamera', data)
+        self.assertNotIn('exif', Image.open(BytesIO(data)).info)
+
+    def test_image_limits(self):
+        cases = (
+            ({'POST_IMAGE_MAX_UPLOAD_SIZE': 100}, 'Файл больше'),
+            ({'POST_IMAGE_MAX_PIXELS': 100}, 'Слишком большое разрешение'),
+        )
+        for limits, error in cases:
+            with self.subTest(limits=limits), self.settings(**limits):
+                response = self.authorized_client.post(
+                    reverse('posts:post_create'),
+                    data={
+                        'text': 'Огромная картинка',
+                        'image': SimpleUploadedFile(
+                            'big.png', self.make_png((300, 300))
+                        ),
+                    },
+                )
+                errors = response.context['form'].errors['image']
+                self.assertIn(error, errors[0])
+        self.assertFalse(
+            Post.objects.filter(text='Огромная картинка').exists()
+        )
+
+    def test_identical_images_share_file_and_renditions(self):
+        content = self.make_png((600, 300))
+        first = Post.objects.create(
+            author=self.user, text='Первый',
+            image=SimpleUploadedFile('a.png', content),
+        )
+        run_pending()
+        second = Post.objects.create(
+            author=self.user, text='Второй',
+            image=SimpleUploadedFile('b.png', content),
+        )
+        first.refresh_from_db()
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(second.renditions, first.renditions)
+        self.assertFalse(
+            Job.objects.filter(name='posts.render_renditions',
+                               status=Job.PENDING).exists()
+        )
+
+    def test_image_is_released_with_last_reference(self):
+        content = self.make_png((600, 300))
+        posts = [
+            Post.objects.create(
+                author=self.user, text=f'Копия {i}',
+                image=SimpleUploadedFile(f'{i}.png', content),
+            ) for i in range(2)
+        ]
+        run_pending()
+        name = posts[0].image.name
+        storage = posts[0].image.storage
+        rendition = self.jpeg_rendition(name)
+        self.assertTrue(default_storage.exists(rendition))
+        posts[0].delete()
+        self.age(storage.path(name))
+        run_pending()
+        self.assertTrue(storage.exists(name))
+        posts[1].delete()
+        run_pending()
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(default_storage.exists(rendition))
+
+    def test_gc_media_removes_orphans(self):
+        post = Post.objects.create(
+            author=self.user, text='Сирота',
+            image=SimpleUploadedFile('orphan.png', self.make_png((90, 90))),
+        )
+        run_pending()
+        name = post.image.name
+        Post.objects.filter(pk=post.pk).update(image='', renditions='')
+        out = StringIO()
+        call_command('gc_media', '--dry-run', '--grace=0', stdout=out)
+        self.assertIn(name, out.getvalue())
+        self.assertTrue(post.image.storage.exists(name))
+        self.assertTrue(default_storage.exists(self.jpeg_rendition(name)))
+        call_command('gc_media', '--grace=0', stdout=out)
+        self.assertFalse(post.image.storage.exists(name))
+        self.assertFalse(default_storage.exists(self.jpeg_rendition(name)))
+
+    @staticmethod
+    def jpeg_rendition(name):
+        return next(
+            path for path in renditions_of(name) if path.endswith('.jpeg')
+        )
+
+    @staticmethod
+    def age(path):
+        old = time.time() - 24 * 60 * 60
+        os.utime(path, (old, old))
+
+    @staticmethod
+    def make_png(size):
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 30, 30)).save(buffer, 'PNG')
+        return buffer.getvalue()
@@ -0,0 +1,159 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..analysis import analyze, stem_russian
+from ..models import Group, Post
+
+User = get_user_model()
+
+SIMPLE = 'posts.search_backends.simple.SimpleBackend'
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Albus')
+        cls.other = User.objects.create_user(username='Severus')
+        cls.group = Group.objects.create(title='Зелья', slug='potions')
+        cls.long_post = Post.objects.create(
+            author=cls.user,
+            text='Длинный пост о многом: погода, дорога, обед '
+                 'и немного про котов в самом конце.',
+        )
+        cls.short_post = Post.objects.create(
+            author=cls.other, group=cls.group, text='Коты и котята',
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user, text='Совсем про другое',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def found(self, query, **filters):
+        return [post.pk for post in search.search(query, **filters)[:]]
+
+    def test_ranking(self):
+        self.assertEqual(
+            self.found('котята'), [self.short_post.pk],
+        )
+        self.assertEqual(
+            self.found('кот*'), [self.short_post.pk, self.long_post.pk],
+        )
+
+    def test_inflected_forms(self):
+        self.assertEqual(
+            self.found('котов'), [self.short_post.pk, self.long_post.pk],
+        )
+        self.assertEqual(self.found('дорогой погоды'), [self.long_post.pk])
+        self.assertEqual(self.found('о погоде и'), [self.long_post.pk])
+
+    def test_analyzer(self):
+        self.assertEqual(
+            analyze('Ещё раз: ЁЖИКИ бегали по дорогам!'),
+            'раз ежик бега дорог',
+        )
+        for word, expected in (('важнейшими', 'важн'),
+                               ('валяются', 'валя'),
+                               ('радость', 'радост'),
+                               ('бегающий', 'бега')):
+            with self.subTest(word=word):
+                self.assertEqual(stem_russian(word), expected)
+        self.assertEqual(search.parse_query('по'), [])
+        self.assertEqual(
+            search.parse_query('по*'), [search.Term('по', True)],
+        )
+        self.assertEqual(search.parse_query('по дороге'),
+                         [search.Term('дорог', True)])
+
+    def test_reindex_covers_bulk_created_posts(self):
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Филин номер {i}') for i in range(3)
+        ])
+        self.assertEqual(self.found('филины'), [])
+        out = StringIO()
+        call_command('rebuild', 'search', batch_size=2, stdout=out)
+        self.assertIn('search: готово, строк 6', out.getvalue())
+        self.assertEqual(len(self.found('филины')), 3)
+        self.assertEqual(self.found('кот*')[0], self.short_post.pk)
+
+    def test_empty_index_is_filled_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM posts_post_fts')
+        self.assertEqual(self.found('котята'), [])
+        search.reindex_if_empty(using='default')
+        self.assertEqual(self.found('котята'), [self.short_post.pk])
+
+    def test_prefix(self):
+        self.assertEqual(self.found('Совсем др'), [self.other_post.pk])
+        self.assertEqual(self.found('др совсем'), [])
+        self.assertEqual(self.found('!!!'), [])
+
+    def test_filters(self):
+        self.assertEqual(
+            self.found('кот*', group_id=self.group.pk), [self.short_post.pk],
+        )
+        self.assertEqual(
+            self.found('кот*', author_id=self.user.pk), [self.long_post.pk],
+        )
+
+    def test_index_follows_edits(self):
+        post = Post.objects.create(author=self.user, text='Про филинов')
+        self.assertEqual(self.found('филинов'), [post.pk])
+        post.text = 'Теперь про птиц'
+        post.save()
+        self.assertEqual(self.found('филинов'), [])
+        self.assertEqual(self.found('птиц'), [post.pk])
+        post.delete()
+        self.assertEqual(self.found('птиц'), [])
+        self.assertEqual(search.search('птиц').count(), 0)
+
+    @override_settings(SEARCH_BACKEND=SIMPLE)
+    def test_simple_backend(self):
+        self.assertEqual(self.found('котята'), [self.short_post.pk])
+        self.assertEqual(
+            self.found('кот', author_id=self.user.pk), [self.long_post.pk],
+        )
+        self.assertEqual(
+            self.found('Котов'), [self.short_post.pk, self.long_post.pk],
+        )
+        self.assertEqual(self.found('дорогой погоды'), [self.long_post.pk])
+        post = Post.objects.create(author=self.user, text='Ёжики в тумане')
+        self.assertEqual(self.found('ежик'), [post.pk])
+
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_search_page(self):
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'кот', 'author': ''},
+        )
+        self.assertEqual(response.status_code, 200)
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 2)
+        self.assertEqual(page_obj[0], self.short_post)
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%82&amp;author=&amp;page=2'
+        )
+
+    def test_search_page_filters(self):
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'кот', 'group': 'potions'},
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.short_post])
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'кот', 'author': 'nobody'},
+        )
+        self.assertIsNone(response.context['page_obj'])
+        self.assertFormError(
+            response, 'form', 'author', 'Такого пользователя нет.'
+        )
+        response = self.client.get(reverse('posts:search'))
+        self.assertIsNone(response.context['page_obj'])
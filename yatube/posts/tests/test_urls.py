@@ -1,7 +1,13 @@
-from django.core.cache import cache
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 
+from core.middleware import PIN_COOKIE
+
+from ..generations import generation_key
 from ..models import Group, Post
 
 User = get_user_model()
@@ -86,7 +92,11 @@ class StaticURLTests(TestCase):
                 self.assertTemplateUsed(response, template)
 
     def test_index_cache(self):
-        response = self.authorized_client.get('/')
+        cache.clear()
+        response = self.guest_client.get('/')
+        self.assertContains(response, self.post.text, status_code=200)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        response = self.guest_client.get('/')
         self.assertContains(response, self.post.text, status_code=200)
         new_data = {
             'text': f'{self.post.text} 2'
@@ -95,8 +105,73 @@ class StaticURLTests(TestCase):
             '/create/',
             new_data,
         )
-        response = self.authorized_client.get('/')
-        self.assertNotContains(response, new_data.get('text'), status_code=200)
-        cache.clear()
-        response = self.authorized_client.get('/')
+        response = self.guest_client.get('/')
         self.assertContains(response, new_data.get('text'), status_code=200)
+
+    def test_post_page_cache_invalidated_by_comment(self):
+        cache.clear()
+        url = f'/posts/{self.post.pk}/'
+        self.guest_client.get(url)
+        self.authorized_client2.post(
+            f'/posts/{self.post.pk}/comment/', {'text': 'Новый коммент'}
+        )
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Новый коммент', status_code=200)
+
+    def test_conditional_get(self):
+        cache.clear()
+        url = f'/posts/{self.post.pk}/'
+        response = self.guest_client.get(url)
+        # Изменение этой секунды сверяется только по ETag.
+        self.assertFalse(response.has_header('Last-Modified'))
+        later = time.time() + 2
+        with mock.patch('posts.page_cache.time.time', return_value=later):
+            response = self.guest_client.get(url)
+            etag = response['ETag']
+            last_modified = response['Last-Modified']
+            for headers in ({'HTTP_IF_NONE_MATCH': etag},
+                            {'HTTP_IF_MODIFIED_SINCE': last_modified}):
+                with self.subTest(headers=headers):
+                    response = self.guest_client.get(url, **headers)
+                    self.assertEqual(response.status_code, 304)
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+        # Первый ответ выставил CSRF-cookie, она входит в ETag.
+        response = self.authorized_client.get(url)
+        self.assertEqual(
+            self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code, 304
+        )
+        self.authorized_client2.post(
+            f'/posts/{self.post.pk}/comment/', {'text': 'Новый коммент'}
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_of_writer_is_checked_against_shared_cache(self):
+        cache.clear()
+        caches['tiered'].clear()
+        url = f'/posts/{self.post.pk}/'
+        pinned = Client()
+        pinned.cookies[PIN_COOKIE] = '1'
+        # Первый ответ вошедшему выставляет CSRF-cookie, она входит в ETag.
+        self.authorized_client.get(url)
+        etags = {
+            client: client.get(url)['ETag']
+            for client in (self.guest_client, pinned, self.authorized_client)
+        }
+        # Другой процесс изменил пост: локальный уровень этого процесса
+        # ещё помнит старое поколение.
+        cache.incr(generation_key('post', self.post.pk))
+        self.assertEqual(
+            self.guest_client.get(
+                url, HTTP_IF_NONE_MATCH=etags[self.guest_client]
+            ).status_code, 304
+        )
+        for client in (pinned, self.authorized_client):
+            with self.subTest(client=client):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[client])
+                self.assertEqual(response.status_code, 200)
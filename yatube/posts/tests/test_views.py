@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Comment, Follow, Group, Post
 
 User = get_user_model()
 
@@ -126,3 +129,81 @@ class PostPagesTests(TestCase):
                     reverse(name, kwargs=params) + '?page=2'
                 )
                 self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_cursor_pagination_walks_whole_feed(self):
+        url = reverse('posts:index')
+        with self.settings(POSTS_PAGINATION='cursor'):
+            response = self.authorized_client.get(url)
+        seen = list(response.context['page_obj'])
+        self.assertEqual(len(seen), 10)
+        next_cursor = response.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, {'after': next_cursor})
+        self.assertFalse(
+            any('COUNT' in query['sql'] for query in queries.captured_queries)
+        )
+        page_obj = response.context['page_obj']
+        seen += list(page_obj)
+        self.assertEqual(len(page_obj), 5)
+        self.assertFalse(page_obj.has_next())
+        self.assertEqual(seen, list(Post.objects.order_by('-pub_date', '-pk')))
+        response = self.authorized_client.get(
+            url, {'before': page_obj.previous_cursor}
+        )
+        self.assertEqual(list(response.context['page_obj']), seen[:10])
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_cursor_pagination_broken_token_shows_first_page(self):
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            {'after': 'not-a-cursor'}
+        )
+        self.assertEqual(response.context['page_obj'][0], self.first_post)
+
+
+class QueryBudgetTests(TestCase):
+    """Число запросов страницы не должно зависеть от числа постов на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Albus')
+        cls.reader = User.objects.create_user(username='Severus')
+        cls.group = Group.objects.create(title='Заголовок', slug='tesg')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(10):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Test {i}'
+            )
+        for i in range(10):
+            Comment.objects.create(
+                post=cls.post,
+                author=User.objects.create_user(username=f'reader{i}'),
+                text=f'Comment {i}',
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_views_query_budget(self):
+        budgets = {
+            # Включая пользователя сессии: с процессным кэшем он читается
+            # из базы на каждом запросе (с общим — из кэша, users.tests).
+            reverse('posts:index'): 3,
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}): 4,
+            # Число страниц — по COUNT(*): счётчик постов может разойтись.
+            reverse('posts:profile', kwargs={'username': self.author}): 5,
+            # Включая поиск автора и группы поста для ETag.
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 4,
+            reverse('posts:follow_index'): 4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.client.get(url)
+        # Повторно пост берётся из кэша поиска.
+        with self.assertNumQueries(3):
+            self.client.get(
+                reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+            )
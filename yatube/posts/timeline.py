@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import Follow, Post, TimelineEntry, UserStats
+
+
+def followers_count(author_id):
+    """Число подписчиков из счётчика автора, без COUNT по подпискам."""
+    count = UserStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True).first()
+    if count is None:
+        count = Follow.objects.filter(author_id=author_id).count()
+    return count
+
+
+def is_pull_author(author_id):
+    """
+    Автор с числом подписчиков выше TIMELINE_FANOUT_LIMIT не раскладывает
+    посты по лентам: читатели подтягивают их сами при чтении.
+    """
+    return followers_count(author_id) > settings.TIMELINE_FANOUT_LIMIT
+
+
+def push_post(post):
+    """Раскладывает новый пост в ленты всех подписчиков автора."""
+    if is_pull_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post.pk,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+            ) for user_id in followers.iterator()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту пользователя все посты нового автора."""
+    if is_pull_author(author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('pk', 'pub_date')
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            ) for post_id, pub_date in posts.iterator()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def materialize(author_id):
+    """
+    Автор снова раскладывает посты сам: в ленты его подписчиков
+    добавляются посты, которые раньше подтягивались при чтении.
+    """
+    if is_pull_author(author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    for user_id in followers.iterator():
+        backfill(user_id, author_id)
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты пользователя посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+
+
+def pull_authors(user):
+    """
+    Авторы из подписок пользователя, чьи посты читаются при запросе.
+    По тому же счётчику, что и is_pull_author, чтобы раскладка
+    и чтение не разошлись.
+    """
+    followed = Follow.objects.filter(user=user).values('author_id')
+    return UserStats.objects.filter(
+        user_id__in=followed,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('user_id', flat=True)
+
+
+def follow_feed(user):
+    """
+    Лента подписок пользователя, упорядоченная по (feed_date, feed_post).
+    Без «тяжёлых» авторов это столбцы записи ленты, и страница — один
+    проход по индексу (user, pub_date, post); иначе к ленте
+    подмешиваются посты этих авторов.
+    """
+    pulled = list(pull_authors(user))
+    if not pulled:
+        return Post.objects.filter(
+            timeline_entries__user=user
+        ).annotate(
+            feed_date=F('timeline_entries__pub_date'),
+            feed_post=F('timeline_entries__post_id'),
+        ).order_by('-feed_date', '-feed_post')
+    pushed = TimelineEntry.objects.filter(user=user).values('post_id')
+    return Post.objects.filter(
+        Q(pk__in=pushed) | Q(author_id__in=pulled)
+    ).annotate(
+        feed_date=F('pub_date'),
+        feed_post=F('pk'),
+    ).order_by('-feed_date', '-feed_post')
@@ -0,0 +1,84 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image, ImageOps
+
+# Форматы, которые пересохраняются без метаданных. Анимацию и прочие
+# форматы не трогаем: они только проверяются на лимиты.
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+    'GIF': {},
+}
+METADATA = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment')
+
+
+class OversizedUpload(UploadedFile):
+    """Загрузка больше лимита: содержимое отброшено, известен только размер."""
+
+    def __init__(self, name, content_type, size, charset=None,
+                 content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset,
+                         content_type_extra)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    Первый в цепочке FILE_UPLOAD_HANDLERS. Файл больше
+    POST_IMAGE_MAX_UPLOAD_SIZE дальше не передаётся: остаток потока
+    читается и выбрасывается, вместо файла приходит OversizedUpload.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.oversized = True
+        if self.oversized:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.oversized:
+            return None
+        return OversizedUpload(
+            self.file_name, self.content_type, file_size,
+            self.charset, self.content_type_extra,
+        )
+
+
+def normalize(upload):
+    """
+    Разворачивает картинку по EXIF, уменьшает до POST_IMAGE_MAX_SIDE
+    по большей стороне и пересохраняет без метаданных. JPEG при этом
+    декодируется сразу в уменьшенном масштабе.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    fmt = image.format
+    if fmt not in SAVE_OPTIONS or getattr(image, 'is_animated', False):
+        upload.seek(0)
+        return upload
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    icc_profile = image.info.get('icc_profile')
+    image.draft(None, (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    # Без этого PNG и WebP сохраняются с EXIF и XMP из image.info.
+    for key in METADATA:
+        image.info.pop(key, None)
+    options = dict(SAVE_OPTIONS[fmt], exif=b'')
+    if icc_profile and fmt != 'GIF':
+        options['icc_profile'] = icc_profile
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return SimpleUploadedFile(
+        upload.name, buffer.getvalue(), upload.content_type
+    )
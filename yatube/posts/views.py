@@ -1,19 +1,28 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Follow
+from core.db import atomic_retry
 
+from . import page_cache
+from .forms import PostForm, CommentForm, SearchForm
+from .models import Post, User, Follow
+from .page_cache import cache_page_versioned
+from .lookups import get_author_or_404, get_group_or_404
+from .paginator import get_page
+from .search import search as search_posts
+from .stats import stats_for
+from .timeline import follow_feed
 
+
+@cache_page_versioned(page_cache.index_scopes)
 def index(request):
     """
     Главна страница сайта. Выводит последние 10 постов.
     """
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    page_obj = get_page(request, post_list)
     index_page = True
     context = {
         'index_page': index_page,
@@ -22,15 +31,14 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@cache_page_versioned(page_cache.group_scopes)
 def group_posts(request, slug):
     """
     Выводит страницу со списком постов группы.
     """
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = get_group_or_404(slug)
+    posts = group.posts.for_feed()
+    page_obj = get_page(request, posts)
     context = {
         'post': posts,
         'group': group,
@@ -39,32 +47,33 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_page_versioned(page_cache.profile_scopes)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    user_posts = user.posts.all()
-    count_user_posts = user_posts.count()
-    paginator = Paginator(user_posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    user = get_author_or_404(username)
+    user_stats = stats_for(user)
+    user_posts = user.posts.for_feed()
+    page_obj = get_page(request, user_posts)
     following = request.user.is_authenticated and Follow.objects.filter(
         author=user, user=request.user).exists()
     context = {
         'author': user,
-        'count_posts': count_user_posts,
+        'count_posts': user_stats.posts_count,
+        'stats': user_stats,
         'page_obj': page_obj,
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cache_page_versioned(page_cache.post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    user_posts = post.author.posts.all()
-    count_user_posts = user_posts.count()
-    comment_post = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__stats'), pk=post_id
+    )
+    comment_post = post.comments.for_display()
     form = CommentForm()
     context = {
-        'count_posts': count_user_posts,
+        'count_posts': stats_for(post.author).posts_count,
         'post': post,
         'comments': comment_post,
         'form': form
@@ -72,6 +81,29 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    """
+    Поиск по текстам постов с фильтрами по группе и автору.
+    """
+    form = SearchForm(request.GET or None)
+    page_obj = None
+    if form.is_valid():
+        group = form.cleaned_data['group']
+        author = form.cleaned_data['author']
+        results = search_posts(
+            form.cleaned_data['q'],
+            group_id=group.pk if group else None,
+            author_id=author.pk if author else None,
+        )
+        paginator = Paginator(results, settings.POSTS_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -80,7 +112,8 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with atomic_retry():
+            post.save()
         return redirect('posts:profile', username=request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -97,7 +130,8 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        with atomic_retry():
+            form.save()
         return redirect('posts:post_detail', post_id=post.pk)
     return render(
         request, 'posts/create_post.html',
@@ -112,19 +146,17 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with atomic_retry():
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
     follow_page = True
-    post_list = Post.objects.filter(
-        author__following__user=request.user).select_related(
-            'group', 'author').all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = follow_feed(request.user).for_feed()
+    page = get_page(request, post_list, field='feed_date',
+                    key='feed_post')
     context = {
         'page_obj': page,
         'follow_page': follow_page
@@ -136,15 +168,17 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.get_or_create(author=author, user=request.user)
+        with atomic_retry():
+            Follow.objects.get_or_create(author=author, user=request.user)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(
-        author=author,
-        user=request.user
-    ).delete()
+    with atomic_retry():
+        Follow.objects.filter(
+            author=author,
+            user=request.user
+        ).delete()
     return redirect('posts:profile', username=username)
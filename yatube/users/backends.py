@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from core import routers
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя сессии из кэша:
+    AuthenticationMiddleware спрашивает его на каждом запросе.
+    Запись сбрасывается при сохранении и удалении пользователя
+    (users.signals), в том числе при смене и сбросе пароля, так что
+    сессии со старым хэшем пароля сразу перестают действовать.
+    Поэтому кэш должен быть общим для всех процессов, а промах
+    читается из default: реплика может ещё не знать новый пароль.
+    """
+
+    def __init__(self):
+        if isinstance(caches['default'], LocMemCache):
+            raise ImproperlyConfigured(
+                'CachedModelBackend нужен общий кэш: '
+                'CACHE_BACKEND=file, sqlite или redis.'
+            )
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            with routers.primary():
+                user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.LOOKUP_CACHE_TIMEOUT)
+        return user
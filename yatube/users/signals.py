@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_cache_key
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    key = user_cache_key(instance.pk)
+    cache.delete(key)
+    # И ещё раз после коммита: параллельный запрос мог успеть положить
+    # в кэш строку, которая ещё не изменилась.
+    transaction.on_commit(lambda: cache.delete(key))
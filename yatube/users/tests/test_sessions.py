@@ -0,0 +1,115 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import routers
+from posts.models import Post
+
+from ..backends import CachedModelBackend, user_cache_key
+
+User = get_user_model()
+
+
+class SessionTests(TransactionTestCase):
+    # Кэш пользователя сбрасывается в on_commit: нужны настоящие коммиты.
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.location = os.path.join(directory, 'cache.sqlite3')
+        shared = self.settings(
+            CACHES={**settings.CACHES, 'default': {
+                'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+                'LOCATION': self.location,
+            }},
+            AUTHENTICATION_BACKENDS=['users.backends.CachedModelBackend'],
+        )
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.user = User.objects.create_user('Minerva', password='Tabby-1954')
+        Post.objects.create(text='Пост', author=self.user)
+        self.client.force_login(self.user)
+
+    def test_authenticated_page_without_session_and_user_queries(self):
+        for storage in ('cached_db', 'cache', 'signed_cookies'):
+            with self.subTest(storage=storage), self.settings(
+                    SESSION_ENGINE=settings.SESSION_STORAGES[storage]):
+                client = Client()
+                client.force_login(self.user)
+                client.get(reverse('posts:index'))
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(reverse('posts:index'))
+                self.assertEqual(response.context['user'], self.user)
+                for query in queries:
+                    self.assertNotIn('django_session', query['sql'])
+                    self.assertNotIn('FROM "auth_user" WHERE', query['sql'])
+
+    def test_password_change_logs_out_other_sessions(self):
+        other = Client()
+        other.force_login(self.user)
+        follow_url = reverse('posts:follow_index')
+        self.assertEqual(other.get(follow_url).status_code, 200)
+        response = self.client.post(reverse('users:password_change'), {
+            'old_password': 'Tabby-1954',
+            'new_password1': 'Animagus-1935',
+            'new_password2': 'Animagus-1935',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(follow_url).status_code, 200)
+        self.assertRedirects(
+            other.get(follow_url),
+            f'{reverse("users:login")}?next={follow_url}',
+        )
+
+    def other_process(self, code):
+        """Выполняет code в отдельном процессе с тем же общим кэшем."""
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE='yatube.settings',
+            CACHE_BACKEND='sqlite', CACHE_LOCATION=self.location,
+        )
+        script = (
+            'import django; django.setup(); '
+            'from django.core.cache import cache; ' + code
+        )
+        return subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+            check=True, stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout.strip()
+
+    def test_password_change_reaches_other_processes(self):
+        key = user_cache_key(self.user.pk)
+        # Другой процесс сервера закэшировал пользователя.
+        self.other_process(f'cache.set({key!r}, "stale")')
+        self.assertEqual(cache.get(key), 'stale')
+        self.user.set_password('Animagus-1935')
+        self.user.save()
+        self.assertEqual(
+            self.other_process(f'print(cache.get({key!r}))'), 'None'
+        )
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_cache_miss_reads_primary(self):
+        routers.reset()
+        self.addCleanup(routers.reset)
+        routers.use_replica()
+        with CaptureQueriesContext(connections['default']) as queries:
+            user = CachedModelBackend().get_user(self.user.pk)
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(routers._state.replica, 'replica')
+
+    def test_process_local_cache_is_refused(self):
+        with self.settings(CACHES={**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}), self.assertRaises(ImproperlyConfigured):
+            CachedModelBackend()
@@ -0,0 +1,37 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``: ``uvicorn yatube.asgi:application``.
+
+Django 2.2 has no ASGI handler and no async views, so this is a
+deliberately narrow entry point: the WSGI handler behind asgiref's
+WsgiToAsgi adapter. Every request gets its own thread
+(ThreadSensitiveContext, as in Django's own ASGI handler). The whole
+request runs in that thread: the view, the response iteration and
+close(). Async views, awaited cache calls and concurrent queries need
+Django 3.1+ and are out of scope here.
+
+The request threads end with their request, so persistent database
+connections are off by default (DB_CONN_MAX_AGE=0). Concurrency is
+limited by the server, e.g. ``uvicorn --limit-concurrency``.
+"""
+
+import os
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+
+def thread_per_request(app):
+    async def application(scope, receive, send):
+        async with ThreadSensitiveContext():
+            await app(scope, receive, send)
+    return application
+
+
+application = thread_per_request(WsgiToAsgi(get_wsgi_application()))
@@ -23,7 +23,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = '8vro55(qyo7yb+leno+n0u3iqyez=vn@-*%ou!5z7yo__*txfk'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.replica_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -85,13 +87,47 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# SQLite под нагрузкой нескольких потоков и процессов: WAL (читатели
+# не ждут пишущих), BEGIN IMMEDIATE в atomic() (см.
+# core.db_backends.sqlite3) и соединение на поток, живущее между
+# запросами, чтобы PRAGMA не выполнялись на каждом запросе.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db_backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 600)),
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 1024 * 1024,
+                # Отрицательное значение — в КиБ: 64 МБ на соединение.
+                'cache_size': -64 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
     }
 }
 
+# Реплики только для чтения: DB_REPLICAS — пути к файлам через запятую
+# (локально их наполняет manage.py replicate). GET-запросы читают
+# с реплики, запись идёт в default (core.routers.ReplicaRouter).
+# DATABASE_REPLICA_LAG — сколько может отставать реплика: столько
+# после своей записи браузер читает из default, и так же из default
+# строятся страницы, изменённые за это время.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_REPLICA_LAG = int(os.getenv('DB_REPLICA_LAG', 5))
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -136,6 +172,14 @@ LOGIN_REDIRECT_URL = 'posts:index'
 LOGOUT_REDIRECT_URL = None
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.getenv(
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'collected_static')
+)
+if not DEBUG:
+    # Имена с хэшем содержимого и заранее сжатые копии (collectstatic).
+    STATICFILES_STORAGE = (
+        'core.staticfiles.CompressedManifestStaticFilesStorage'
+    )
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -143,8 +187,138 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Кто отдаёт статику и медиа без DEBUG:
+# ''      — веб-сервер сам, приложение их не видит;
+# 'app'   — приложение через wsgi.file_wrapper (sendfile);
+# 'accel' — приложение проверяет путь и отвечает X-Accel-Redirect,
+#           файл отдаёт nginx из internal-location FILES_ACCEL_*.
+FILES_SERVING = os.getenv('FILES_SERVING', '')
+FILES_ACCEL_STATIC = '/internal/static/'
+FILES_ACCEL_MEDIA = '/internal/media/'
+# Для файлов без хэша в имени; с хэшем кэшируются навсегда.
+FILES_MAX_AGE = 60 * 60
+
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Кэш выбирается переменными окружения CACHE_BACKEND и CACHE_LOCATION.
+# locmem — свой у каждого процесса; file и sqlite — общий для процессов
+# одной машины; redis — общий для нескольких машин.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(BASE_DIR, 'cache'),
+    ),
+    'sqlite': (
+        'core.cache_backends.sqlite.SQLiteCache',
+        os.path.join(BASE_DIR, 'cache.sqlite3'),
+    ),
+    'redis': (
+        'core.cache_backends.redis.RedisCache',
+        'redis://127.0.0.1:6379/0',
+    ),
+}
+CACHE_BACKEND, CACHE_LOCATION = CACHE_BACKENDS[
+    os.getenv('CACHE_BACKEND', 'locmem')
+]
+SHARED_CACHE = CACHE_BACKEND != CACHE_BACKENDS['locmem'][0]
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_LOCATION),
+        'OPTIONS': {},
     }
 }
+# Локальный LRU-уровень процесса перед общим кэшем: через него читаются
+# поколения кэша и часто запрашиваемые группы и авторы. Другие процессы
+# видят изменения с задержкой не больше LOCAL_TIMEOUT секунд.
+CACHES['tiered'] = {
+    'BACKEND': 'core.cache_backends.tiered.TieredCache',
+    'OPTIONS': {
+        'SHARED_ALIAS': 'default',
+        'MAX_ENTRIES': int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 1000)),
+        'LOCAL_TIMEOUT': int(os.getenv('LOCAL_CACHE_TIMEOUT', 5)),
+    },
+}
+GENERATIONS_CACHE_ALIAS = 'tiered'
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+if os.getenv('CACHE_REDIS_CLIENT'):
+    # Например, core.cache_backends.fake_redis.FakeRedis для запуска
+    # без сервера Redis.
+    CACHES['default']['OPTIONS']['CLIENT_CLASS'] = os.getenv(
+        'CACHE_REDIS_CLIENT'
+    )
+
+# Где хранятся сессии (SESSION_STORAGE): cached_db — в базе и в кэше,
+# откуда и читаются; cache — только в CACHES['default'] (общем для
+# процессов только с file, sqlite или redis); db — в базе;
+# signed_cookies — в подписанной cookie, без запросов к базе и кэшу,
+# но выход не отзывает уже выданную cookie.
+SESSION_STORAGES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_STORAGES[os.getenv('SESSION_STORAGE', 'cached_db')]
+# Пользователь сессии берётся из кэша, а не из базы на каждом запросе,
+# только если кэш общий: сброс записи при смене пароля должен дойти
+# до всех процессов.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend' if SHARED_CACHE
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+
+POSTS_PER_PAGE = 10
+
+# Полнотекстовый поиск: FTS5 на SQLite, на других базах — поиск
+# подстрокой (posts.search_backends.simple.SimpleBackend).
+SEARCH_BACKEND = os.getenv(
+    'SEARCH_BACKEND',
+    'posts.search_backends.sqlite.FTS5Backend'
+    if DATABASES['default']['ENGINE'].endswith('sqlite3')
+    else 'posts.search_backends.simple.SimpleBackend'
+)
+# Цепочка фильтров, через которую проходят слова постов и запросов
+# (posts.analysis). После изменения — manage.py rebuild search.
+SEARCH_ANALYZER = [
+    'posts.analysis.lowercase',
+    'posts.analysis.fold_yo',
+    'posts.analysis.drop_stopwords',
+    'posts.analysis.stem',
+]
+
+# 'page' — нумерованные страницы (?page=N),
+# 'cursor' — keyset-пагинация по токенам ?after=/?before=
+POSTS_PAGINATION = 'page'
+
+# Авторы с большим числом подписчиков не раскладывают посты по лентам
+# при публикации: их посты подмешиваются в ленту при чтении.
+TIMELINE_FANOUT_LIMIT = 1000
+# Раскладка на большее число лент уходит из запроса в фоновую задачу.
+TIMELINE_SYNC_FANOUT_LIMIT = 100
+
+# Сколько хранится закэшированная страница. Устаревшие страницы
+# отсекаются раньше: ключ включает поколения постов, групп и авторов.
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Версии картинки поста, которые готовятся в фоне после загрузки:
+# кадр с пропорциями POST_IMAGE_RATIO в нескольких ширинах и форматах.
+# Последний формат — запасной для браузеров без поддержки остальных.
+POST_IMAGE_RATIO = (960, 339)
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_FORMATS = ('webp', 'jpeg')
+
+# Лимиты на загружаемую картинку. Оригинал хранится уменьшенным
+# до POST_IMAGE_MAX_SIDE по большей стороне и без EXIF.
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+POST_IMAGE_MAX_SIDE = 2560
+
+# Фоновый обработчик задач (manage.py run_worker): 'thread' или 'process'.
+TASKS_POOL = os.getenv('TASKS_POOL', 'thread')
+TASKS_CONCURRENCY = int(os.getenv('TASKS_CONCURRENCY', 2))
@@ -13,11 +13,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core import files
+from core.views import cache_stats
+
 
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
@@ -29,8 +34,26 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/', include('api.urls', namespace='api')),
+    path('cache-stats/', cache_stats, name='cache_stats'),
 ]
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+elif settings.FILES_SERVING in ('app', 'accel'):
+    accel = settings.FILES_SERVING == 'accel'
+    for url, root, accel_prefix in (
+        (settings.STATIC_URL, settings.STATIC_ROOT,
+         settings.FILES_ACCEL_STATIC),
+        (settings.MEDIA_URL, settings.MEDIA_ROOT,
+         settings.FILES_ACCEL_MEDIA),
+    ):
+        urlpatterns.append(re_path(
+            r'^%s(?P<path>.*)$' % re.escape(url.lstrip('/')),
+            files.serve,
+            {
+                'document_root': root,
+                'accel_prefix': accel_prefix if accel else '',
+            },
+        ))